@@ -0,0 +1,495 @@
+"""HTTP qualification API over core.data for the Next.js app and web forms.
+
+    uvicorn api.server:app --port 8000 --workers 4
+    TIER1_API_FAKE=1 python -m api.server          # no API key needed
+
+Model calls go through the same shared, keep-alive OpenAI client, request
+scheduler and response cache as the Streamlit app; they run on a bounded
+worker pool so the event loop never blocks. Runs are written to the same
+run store, so every UI reads the same scores.
+"""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import anyio
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from core.cache import request_key
+from core.data import (
+    BATCH_MAX_WORKERS,
+    DEFAULT_CLIENT,
+    DEFAULT_JOURNEY,
+    FIX_THRESHOLD,
+    GO_THRESHOLD,
+    LEAD_MODEL,
+    LEAD_TEMPERATURE,
+    MODEL_PRICING,
+    REQUIRED_FIELDS,
+    SAFETY_TESTS,
+    SCENARIOS,
+    VOTE_SAMPLES_MAX,
+    build_lead_run,
+    build_safety_run,
+    call_llm_meta,
+    call_safety_llm_meta,
+    gate_label,
+    get_request_scheduler,
+    get_response_cache,
+    get_run_store,
+    scores_from_aggregate,
+    validate_lead_message,
+)
+from core.metrics import telemetry_summary
+from core.parsing import VALID_LEAD_TAGS
+
+# =============================
+# SETTINGS
+# =============================
+API_USE_FAKE = os.environ.get("TIER1_API_FAKE", "") == "1"
+API_CORS_ORIGINS = os.environ.get("TIER1_API_CORS_ORIGINS", "http://localhost:3000").split(",")
+
+# Model calls in flight per process (each holds a worker thread)
+API_MAX_CONCURRENT_CALLS = 64
+API_MAX_BATCH = 500
+
+# Single-lead runs arriving within this window are written in one transaction
+LOG_BATCH_WINDOW_SECONDS = 0.05
+# Batch runs are logged in chunks as they finish, so event streams see progress
+BATCH_LOG_CHUNK = 10
+
+# Event stream: comment line to keep idle connections open, and how often
+# writes by other processes (e.g. the Streamlit app) are picked up
+EVENTS_KEEPALIVE_SECONDS = 15.0
+EVENTS_EXTERNAL_POLL_SECONDS = 1.0
+
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+API_KEEPALIVE_SECONDS = 75
+
+
+# =============================
+# REQUEST MODELS
+# =============================
+class LeadOptions(BaseModel):
+    use_fake: bool = API_USE_FAKE
+    use_cache: bool = True
+    prefilter: bool = False
+    structured: bool = False
+    max_tokens: Optional[int] = Field(None, ge=1)
+    votes: int = Field(1, ge=1, le=VOTE_SAMPLES_MAX)
+    model: str = LEAD_MODEL
+    temperature: float = Field(LEAD_TEMPERATURE, ge=0, le=2)
+
+    def options(self) -> dict:
+        """Just the LeadOptions fields, also on subclassed request models."""
+        return self.model_dump(include=set(LeadOptions.model_fields))
+
+    def call_kwargs(self) -> dict:
+        """call_llm_meta keyword arguments (everything but use_fake)."""
+        return self.model_dump(include=set(LeadOptions.model_fields) - {"use_fake"})
+
+
+class SprintRef(BaseModel):
+    client: str = DEFAULT_CLIENT
+    journey: str = DEFAULT_JOURNEY
+    log: bool = True  # record the runs in the sprint log
+
+
+class Lead(BaseModel):
+    message: str
+    expected: str = ""  # Hot / Warm / Cold, or "" for an unlabeled lead
+    scenario: str = "API lead"
+
+
+class QualifyRequest(Lead, LeadOptions, SprintRef):
+    pass
+
+
+class BatchRequest(LeadOptions, SprintRef):
+    leads: List[Lead] = Field(..., min_length=1, max_length=API_MAX_BATCH)
+    max_workers: int = Field(BATCH_MAX_WORKERS, ge=1, le=API_MAX_CONCURRENT_CALLS)
+
+
+class SafetyRequest(SprintRef):
+    use_fake: bool = API_USE_FAKE
+    use_cache: bool = True
+    model: str = LEAD_MODEL
+    max_workers: int = Field(BATCH_MAX_WORKERS, ge=1, le=API_MAX_CONCURRENT_CALLS)
+
+
+def _checked_lead(lead: Lead, where: str = "") -> Lead:
+    """Validate the message and normalise the expected tag, or raise a 422."""
+    valid, err = validate_lead_message(lead.message)
+    if not valid:
+        raise HTTPException(422, f"{where}{err}")
+    expected = lead.expected.strip().capitalize()
+    if expected and expected not in VALID_LEAD_TAGS:
+        raise HTTPException(422, f"{where}Unknown expected tag '{lead.expected}' (use Hot, Warm or Cold).")
+    return lead.model_copy(update={"expected": expected})
+
+
+# =============================
+# CONCURRENCY HELPERS
+# =============================
+class RunLogBatcher:
+    """Collects lead runs from concurrent requests into one store write per sprint.
+
+    Each request awaits the flush of its batch, so a run is in the store
+    (and in /v1/scores) by the time its response is sent.
+    """
+
+    def __init__(self, window: float = LOG_BATCH_WINDOW_SECONDS):
+        self.window = window
+        self._pending = None  # (client, journey) -> rows
+        self._flush = None
+
+    async def add(self, client: str, journey: str, rows):
+        if self._pending is None:
+            self._pending = {}
+            self._flush = asyncio.ensure_future(self._flush_after_window())
+        self._pending.setdefault((client, journey), []).extend(rows)
+        await asyncio.shield(self._flush)
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        pending, self._pending = self._pending, None
+        await run_call(_write_lead_runs, pending)
+
+
+def _write_lead_runs(pending: dict):
+    store = get_run_store()
+    for (client, journey), rows in pending.items():
+        store.add_lead_runs(client, journey, rows)
+
+
+_LIMITER = None
+_INFLIGHT = {}  # request key -> task, so duplicate submissions share one call
+
+
+async def run_call(fn, *args):
+    """Run a blocking core.data call on the worker pool."""
+    global _LIMITER
+    if _LIMITER is None:
+        _LIMITER = anyio.CapacityLimiter(API_MAX_CONCURRENT_CALLS)
+    return await anyio.to_thread.run_sync(fn, *args, limiter=_LIMITER)
+
+
+async def map_calls(fn, items, max_workers: int, on_done=None):
+    """Await fn(item) for every item, at most max_workers of them at once.
+
+    Each model call still takes its own slot in the process-wide limiter
+    (fn goes through run_call), so concurrent batches share
+    API_MAX_CONCURRENT_CALLS instead of each adding a pool of its own.
+    `await on_done(result)` runs as each item finishes; results come back
+    in input order.
+    """
+    results = [None] * len(items)
+    slots = anyio.Semaphore(max_workers)
+
+    async def _one(i, item):
+        async with slots:
+            results[i] = await fn(item)
+        if on_done is not None:
+            await on_done(results[i])
+
+    async with anyio.create_task_group() as tg:
+        for i, item in enumerate(items):
+            tg.start_soon(_one, i, item)
+    return results
+
+
+async def qualify_coalesced(message: str, options: LeadOptions):
+    """call_llm_meta, sharing one model call between identical in-flight requests."""
+    key = request_key({"message": message, **options.options()})
+    task = _INFLIGHT.get(key)
+    if task is None:
+
+        def _call():
+            return call_llm_meta(
+                message, use_fake=options.use_fake, show_errors=False, **options.call_kwargs()
+            )
+
+        task = asyncio.ensure_future(run_call(_call))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _task: _INFLIGHT.pop(key, None))
+    return await asyncio.shield(task)
+
+
+class StoreWatcher:
+    """Wakes every event stream when the run store changes.
+
+    One thread per process blocks in RunStore.wait_for_change(); streams
+    wait on an asyncio.Event, so idle subscribers cost no thread and no
+    polling.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = store.version
+        self._changed = asyncio.Event()
+
+    async def run(self):
+        while True:
+            version = await anyio.to_thread.run_sync(
+                self.store.wait_for_change,
+                self.version,
+                EVENTS_EXTERNAL_POLL_SECONDS,
+                abandon_on_cancel=True,
+            )
+            if version != self.version:
+                self.version = version
+                changed, self._changed = self._changed, asyncio.Event()
+                changed.set()
+
+    async def wait(self, version: int, timeout: float) -> int:
+        """Return the store version once it differs from `version` (or on timeout)."""
+        if self.version == version:
+            with anyio.move_on_after(timeout):
+                await self._changed.wait()
+        return self.version
+
+
+def _sse(event: str, data, event_id=None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False))
+    return "\n".join(lines) + "\n\n"
+
+
+async def sprint_scores(client: str, journey: str) -> dict:
+    """Sprint scores and gate from the run store's running totals."""
+    agg = await run_call(get_run_store().aggregate, client, journey)
+    acc, comp, safety_score, rel, run_count, safety_count, false_hot = scores_from_aggregate(agg)
+    has_runs = agg.lead_runs > 0
+    return {
+        "client": client,
+        "journey": journey,
+        # Without runs the formula falls back to demo placeholders
+        "has_lead_runs": has_runs,
+        "accuracy": acc,
+        "completeness": comp,
+        "safety": safety_score,
+        "reliability": rel,
+        "false_hot_rate": false_hot,
+        "lead_runs": agg.lead_runs if has_runs else 0,
+        "safety_runs": agg.safety_runs,
+        "gate": gate_label(rel, safety_score, false_hot) if has_runs else None,
+        "by_tag": agg.by_tag,
+        "parse_failures": agg.parse_failures,
+        "usage": {k: float(v) for k, v in agg.usage.items()},
+        "telemetry": telemetry_summary(agg),
+    }
+
+
+async def sprint_events(request: Request, client: str, journey: str, after_id=None):
+    """SSE stream of one sprint: lead_run, safety and scores events.
+
+    Each lead_run carries the run's id as the event id, so a reconnecting
+    EventSource resumes after the last run it saw. Without `after_id` the
+    stream starts with the current scores and only reports newer runs.
+    Deleted runs show up as a scores change.
+    """
+    store = get_run_store()
+    watcher = request.app.state.watcher
+    if after_id is None:
+        after_id = await run_call(store.last_lead_run_id, client, journey)
+    suite_id = await run_call(store.latest_suite_id, client, journey)
+    last_scores = None
+    version = watcher.version
+    while True:
+        for run in await run_call(
+            lambda: list(store.iter_lead_runs(client, journey, after_id=after_id))
+        ):
+            after_id = run["id"]
+            yield _sse("lead_run", run, event_id=run["id"])
+
+        latest_suite = await run_call(store.latest_suite_id, client, journey)
+        if latest_suite != suite_id:
+            suite_id = latest_suite
+            rows = await run_call(store.safety_runs, client, journey)
+            yield _sse(
+                "safety",
+                {
+                    "suite_id": suite_id,
+                    "passed": sum(r["pass"] for r in rows),
+                    "total": len(rows),
+                    "runs": rows,
+                },
+            )
+
+        current = await sprint_scores(client, journey)
+        if current != last_scores:
+            last_scores = current
+            yield _sse("scores", current)
+
+        if await request.is_disconnected():
+            return
+        new_version = await watcher.wait(version, EVENTS_KEEPALIVE_SECONDS)
+        if new_version == version:
+            yield ": keep-alive\n\n"
+        version = new_version
+
+
+# =============================
+# APP
+# =============================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.run_log = RunLogBatcher()
+    # Open the run store (and migrate its schema) before the first request
+    store = await run_call(get_run_store)
+    app.state.watcher = StoreWatcher(store)
+    watch = asyncio.ensure_future(app.state.watcher.run())
+    yield
+    watch.cancel()
+
+
+app = FastAPI(title="Tier-1 Lead Qualification API", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=API_CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["*"],
+)
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "scheduler": get_request_scheduler().stats(),
+        "cache": get_response_cache().stats(),
+    }
+
+
+@app.get("/v1/config")
+async def config():
+    """Test data and thresholds, so clients don't keep their own copies."""
+    return {
+        "scenarios": [
+            {"scenario": name, "message": message, "expected": expected}
+            for name, message, expected in SCENARIOS
+        ],
+        "required_fields": REQUIRED_FIELDS,
+        "safety_tests": [
+            {"test": name, "category": category, "prompt": prompt}
+            for name, category, prompt in SAFETY_TESTS
+        ],
+        "go_threshold": GO_THRESHOLD,
+        "fix_threshold": FIX_THRESHOLD,
+        "models": list(MODEL_PRICING),
+        "default_model": LEAD_MODEL,
+    }
+
+
+@app.post("/v1/qualify")
+async def qualify(req: QualifyRequest):
+    """Qualify one lead; returns the lead JSON, call meta and the scored run."""
+    lead = _checked_lead(req)
+    js, meta = await qualify_coalesced(lead.message, req)
+    run = build_lead_run(lead.scenario, lead.expected, js, meta)
+    if req.log:
+        await app.state.run_log.add(req.client, req.journey, [run])
+    return {"lead": js, "meta": meta, "run": run}
+
+
+@app.post("/v1/qualify/batch")
+async def qualify_batch(req: BatchRequest):
+    """Qualify many leads concurrently; runs come back in request order."""
+    leads = [_checked_lead(lead, f"leads[{i}]: ") for i, lead in enumerate(req.leads)]
+    unlogged = []
+
+    async def _log(rows):
+        if req.log and rows:
+            await run_call(get_run_store().add_lead_runs, req.client, req.journey, rows)
+
+    async def _qualify(lead):
+        js, meta = await qualify_coalesced(lead.message, req)
+        return build_lead_run(lead.scenario, lead.expected, js, meta)
+
+    async def _on_done(row):
+        unlogged.append(row)
+        if len(unlogged) >= BATCH_LOG_CHUNK:
+            chunk = unlogged[:]
+            unlogged.clear()
+            await _log(chunk)
+
+    runs = await map_calls(_qualify, leads, req.max_workers, on_done=_on_done)
+    await _log(unlogged)
+    return {"runs": runs, "tag_correct": sum(r["tag_correct"] for r in runs)}
+
+
+@app.post("/v1/safety")
+async def safety(req: SafetyRequest):
+    """Run the red-team suite; the result becomes the sprint's latest safety run."""
+    def _test(test):
+        name, category, prompt = test
+        resp_text, passed, meta = call_safety_llm_meta(
+            prompt, use_fake=req.use_fake, use_cache=req.use_cache, model=req.model
+        )
+        return build_safety_run(
+            name, category, prompt, resp_text, passed, meta["latency_ms"], meta
+        )
+
+    rows = await map_calls(
+        lambda test: run_call(_test, test), SAFETY_TESTS, req.max_workers
+    )
+    if req.log:
+        await run_call(get_run_store().set_safety_runs, req.client, req.journey, rows)
+    passed = sum(r["pass"] for r in rows)
+    return {"runs": rows, "passed": passed, "total": len(rows)}
+
+
+@app.get("/v1/scores")
+async def scores(client: str = DEFAULT_CLIENT, journey: str = DEFAULT_JOURNEY):
+    """Sprint scores and gate from the run store's running totals."""
+    return await sprint_scores(client, journey)
+
+
+@app.get("/v1/events")
+async def events(
+    request: Request,
+    client: str = DEFAULT_CLIENT,
+    journey: str = DEFAULT_JOURNEY,
+    after_id: Optional[int] = None,
+):
+    """Server-sent events for a sprint; after_id=0 replays every logged run first."""
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        after_id = int(last_event_id)
+    return StreamingResponse(
+        sprint_events(request, client, journey, after_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def main():
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Tier-1 lead qualification API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run(
+        "api.server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=API_KEEPALIVE_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,124 @@
 import streamlit as st
 
 from core.styling import APP_CSS
-from core.data import seed_demo_data
+from core.data import (
+    DEFAULT_CLIENT,
+    DEFAULT_JOURNEY,
+    LEAD_MODEL,
+    MODEL_PRICING,
+    VOTE_SAMPLES_MAX,
+    seed_demo_data,
+    get_metrics,
+    get_response_cache,
+    client_pool_stats,
+    get_request_scheduler,
+)
 
 from pages.overview import render_overview
 from pages.lead_pilot import render_lead_pilot
 from pages.sprint_log import render_sprint_log
 from pages.safety_suite import render_safety_suite
 from pages.report_page import render_report_page
+from pages.model_sweep import render_model_sweep
 
 
-st.set_page_config(page_title="AI Lead Proof Sprint MVP", layout="wide")
-st.markdown(APP_CSS, unsafe_allow_html=True)
+def render_token_usage(slot):
+    """Sidebar panel: prompt/cached/completion tokens and cost, per run and per sprint."""
+    metrics = get_metrics()
+    total = metrics.usage
+    if not metrics.has_lead_runs or not total.get("prompt_tokens"):
+        slot.empty()
+        return
+    per_run = metrics.usage_per_run()
+    price_in, price_cached, _price_out = MODEL_PRICING.get(LEAD_MODEL, (0.0, 0.0, 0.0))
+    saved = total["cached_tokens"] * (price_in - price_cached) / 1_000_000
+    cached_pct = total["cached_tokens"] / total["prompt_tokens"] * 100
+    with slot.container():
+        st.markdown("##### Token usage")
+        st.markdown(
+            f"""
+            | | Per run | Sprint |
+            |---|---:|---:|
+            | Prompt tokens | {per_run['prompt_tokens']:.0f} | {total['prompt_tokens']:,} |
+            | Cached tokens | {per_run['cached_tokens']:.0f} | {total['cached_tokens']:,} |
+            | Completion tokens | {per_run['completion_tokens']:.0f} | {total['completion_tokens']:,} |
+            | Est. cost (USD) | {per_run['cost_usd']:.5f} | {total['cost_usd']:.4f} |
+            """
+        )
+        st.caption(
+            f"{cached_pct:.0f}% of prompt tokens served from the provider's prompt cache "
+            f"(≈ ${saved:.4f} saved). Priced as {LEAD_MODEL}."
+        )
 
-# Session init
-if "lead_runs" not in st.session_state:
-    st.session_state.lead_runs = []
-if "safety_runs" not in st.session_state:
-    st.session_state.safety_runs = []
 
-# Seed demo data on first load
-seed_demo_data()
+st.set_page_config(page_title="AI Lead Proof Sprint MVP", layout="wide")
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 with st.sidebar:
     st.markdown("### Tier-1 Pilot")
     use_fake = st.toggle("Fake mode (no API key needed)", value=True)
+    use_cache = st.toggle(
+        "Reuse cached model responses",
+        value=st.session_state.get("use_cache", True),
+        help="Identical requests are answered from the local response cache.",
+    )
+    st.session_state.use_cache = use_cache
+    prefilter = st.toggle(
+        "Local rule pre-filter",
+        value=st.session_state.get("prefilter", False),
+        help=(
+            "Obvious Hot/Cold leads are tagged by the local rule classifier; only "
+            "ambiguous ones go to the model. In fake mode the rules replace the demo lead."
+        ),
+    )
+    st.session_state.prefilter = prefilter
+    structured_output = st.toggle(
+        "Structured JSON output",
+        value=st.session_state.get("structured_output", False),
+        help="Ask the model for schema-checked JSON only (no prose summary).",
+    )
+    st.session_state.structured_output = structured_output
+    st.session_state.max_tokens = st.number_input(
+        "Max output tokens (0 = no cap)",
+        min_value=0,
+        max_value=4000,
+        step=50,
+        value=int(st.session_state.get("max_tokens", 0)),
+    )
+    st.session_state.votes = st.number_input(
+        "Self-consistency votes (1 = off)",
+        min_value=1,
+        max_value=VOTE_SAMPLES_MAX,
+        step=2,
+        value=int(st.session_state.get("votes", 1)),
+        help=(
+            "Borderline leads get this many parallel samples and a majority vote on "
+            "the tag; leads the local rules are sure about get a single call."
+        ),
+    )
+    cache_stats = get_response_cache().stats()
+    st.caption(
+        f"Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0f}%) • {cache_stats['entries']} entries"
+    )
+    if st.button("Clear response cache"):
+        get_response_cache().clear()
+    pool_stats = client_pool_stats()
+    if pool_stats["requests"]:
+        st.caption(
+            f"HTTP pool: {pool_stats['requests']} requests over "
+            f"{pool_stats['connections']} connections ({pool_stats['reuse_rate']:.0f}% reused)"
+        )
+    sched = get_request_scheduler().stats()
+    if sched["calls"]:
+        st.caption(
+            f"Scheduler: {sched['retries']} retries, {sched['failures']} failed calls, "
+            f"{sched['throttled_seconds']:.1f}s rate-limit wait • breaker {sched['breaker']}"
+        )
 
     client_name = st.text_input(
         "Client / Project name",
-        value=st.session_state.get("client_name", "Demo Client"),
+        value=st.session_state.get("client_name", DEFAULT_CLIENT),
     )
     client_industry = st.text_input(
         "Industry",
@@ -40,7 +130,7 @@ with st.sidebar:
     )
     journey_name = st.text_input(
         "Journey name",
-        value=st.session_state.get("journey_name", "Website form → AI lead qualification"),
+        value=st.session_state.get("journey_name", DEFAULT_JOURNEY),
     )
     sprint_day = st.number_input(
         "Sprint day (1–5)",
@@ -57,8 +147,14 @@ with st.sidebar:
 
     page = st.radio(
         "View",
-        ["Overview", "Lead Pilot", "Sprint Log & Summary", "Safety Suite", "Report"],
+        ["Overview", "Lead Pilot", "Sprint Log & Summary", "Safety Suite", "Model Sweep", "Report"],
     )
+    # Filled after the page has run, so it includes runs logged in this rerun
+    usage_slot = st.empty()
+
+
+# Seed demo data on first launch (runs are keyed by the client/journey above)
+seed_demo_data()
 
 # Brand header
 st.markdown(
@@ -77,10 +173,10 @@ st.markdown(
 )
 
 # Client context strip (shows on all pages)
-client_name = st.session_state.get("client_name", "Demo Client")
+client_name = st.session_state.get("client_name", DEFAULT_CLIENT)
 client_industry = st.session_state.get("client_industry", "B2B SaaS")
 lead_volume = st.session_state.get("lead_volume", "~200 inbound leads")
-journey_name = st.session_state.get("journey_name", "Website form → AI lead qualification")
+journey_name = st.session_state.get("journey_name", DEFAULT_JOURNEY)
 sprint_day = st.session_state.get("sprint_day", 3)
 
 context_html = f"""
@@ -102,5 +198,9 @@ elif page == "Sprint Log & Summary":
     render_sprint_log()
 elif page == "Safety Suite":
     render_safety_suite(use_fake)
+elif page == "Model Sweep":
+    render_model_sweep(use_fake)
 elif page == "Report":
     render_report_page()
+
+render_token_usage(usage_slot)
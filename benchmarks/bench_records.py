@@ -0,0 +1,98 @@
+"""Memory of compact run records against run-log dicts.
+
+Builds synthetic lead runs, loads them as plain dicts and as LeadRun
+records (core.records), and reports the bytes each takes in process
+(tracemalloc, unique strings included) and pickled (what session state or a
+job result would serialize). Also checks records round-trip to the same
+dicts, key order included.
+
+    python -m benchmarks.bench_records --sizes 1000 10000
+"""
+
+import argparse
+import gc
+import json
+import pickle
+import random
+import tracemalloc
+
+from core.data import REQUIRED_FIELDS, SCENARIOS, build_lead_run
+from core.records import lead_records, to_dicts
+
+# =============================
+# SETTINGS
+# =============================
+DEFAULT_SIZES = (1_000, 10_000)
+BENCH_SEED = 7
+TAGS = ("Hot", "Warm", "Cold")
+
+
+def synthetic_runs(n: int):
+    """Lead runs with per-lead strings, as a sweep arm or import collects them."""
+    rng = random.Random(BENCH_SEED)
+    runs = []
+    for i in range(n):
+        name, _message, expected = SCENARIOS[i % len(SCENARIOS)]
+        js = {f: f"{f} of lead {i}" for f in REQUIRED_FIELDS}
+        js["lead_tag"] = rng.choice(TAGS)
+        js["tag_reasoning"] = f"Reasoning for lead {i}."
+        meta = {"prompt_tokens": 900 + i % 50, "completion_tokens": 120, "latency_ms": 300.0 + i}
+        runs.append(build_lead_run(name, expected, js, meta))
+    return runs
+
+
+def _traced(build):
+    """Bytes still allocated by what build() returns, plus the object."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return obj, size
+
+
+def bench_size(n: int):
+    # Both sides are parsed from the same JSON, so neither shares strings
+    payload = json.dumps(synthetic_runs(n))
+    dicts, dict_bytes = _traced(lambda: json.loads(payload))
+    records, record_bytes = _traced(lambda: lead_records(json.loads(payload)))
+
+    back = to_dicts(records)
+    if back != dicts or [list(r) for r in back] != [list(r) for r in dicts]:
+        raise AssertionError("records do not round-trip to the run-log dicts")
+    if [list(r["raw_json"]) for r in back] != [list(r["raw_json"]) for r in dicts]:
+        raise AssertionError("raw_json key order changed")
+
+    dict_pickled = len(pickle.dumps(dicts))
+    record_pickled = len(pickle.dumps(records))
+    return {
+        "size": n,
+        "dicts_bytes_per_run": dict_bytes / n,
+        "records_bytes_per_run": record_bytes / n,
+        "in_process_ratio": dict_bytes / record_bytes,
+        "dicts_pickled_bytes": dict_pickled,
+        "records_pickled_bytes": record_pickled,
+        "pickled_ratio": dict_pickled / record_pickled,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        res = bench_size(n)
+        cells = "  ".join(
+            f"{k}={v:,.2f}" if isinstance(v, float) else f"{k}={v:,}" for k, v in res.items()
+        )
+        print(cells)
+        results.append(res)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Local stand-in for the OpenAI chat-completions endpoint.
+
+Serves POST /v1/chat/completions (plain and SSE streaming) with a
+configurable latency distribution, error rate and token counts. Lead
+requests are answered with the local rule classifier's JSON, so scores
+stay realistic; safety requests get a refusal.
+
+    python -m benchmarks.fake_openai --port 8799 --latency-ms 400 --error-rate 0.02
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.rules import classify_lead
+
+# =============================
+# SETTINGS
+# =============================
+DEFAULT_LATENCY_MS = 300.0  # median
+DEFAULT_LATENCY_SIGMA = 0.5  # log-normal spread; 0 = fixed latency
+DEFAULT_PROMPT_TOKENS = 450
+DEFAULT_COMPLETION_TOKENS = 180
+STREAM_CHUNK_CHARS = 16
+
+SAFETY_REPLY = "I'm sorry, I can't help with that. It is not allowed under our safety rules."
+
+
+class FakeConfig:
+    """Knobs shared by every request handler of one server."""
+
+    def __init__(
+        self,
+        latency_ms: float = DEFAULT_LATENCY_MS,
+        latency_sigma: float = DEFAULT_LATENCY_SIGMA,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: float = 0.2,
+        prompt_tokens: int = DEFAULT_PROMPT_TOKENS,
+        cached_tokens: int = 0,
+        completion_tokens: int = DEFAULT_COMPLETION_TOKENS,
+        seed: int = None,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.prompt_tokens = prompt_tokens
+        self.cached_tokens = cached_tokens
+        self.completion_tokens = completion_tokens
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def draw(self):
+        """(latency_seconds, should_fail) for one request."""
+        with self._lock:
+            self.requests += 1
+            if self.latency_sigma > 0:
+                latency = self.latency_ms * self._rng.lognormvariate(0, self.latency_sigma)
+            else:
+                latency = self.latency_ms
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return latency / 1000, fail
+
+
+# =============================
+# REPLIES
+# =============================
+def reply_text(body: dict) -> str:
+    messages = body.get("messages") or []
+    system = messages[0]["content"] if messages else ""
+    user = messages[-1]["content"] if messages else ""
+    if "lead-qualification" not in system:
+        return SAFETY_REPLY
+    lead = classify_lead(user).lead
+    lead_json = json.dumps(lead, ensure_ascii=False)
+    if body.get("response_format"):
+        return lead_json
+    return f"{lead['tag_reasoning']} Tag: {lead['lead_tag']}.\n```json\n{lead_json}\n```"
+
+
+def _usage(config: FakeConfig) -> dict:
+    return {
+        "prompt_tokens": config.prompt_tokens,
+        "completion_tokens": config.completion_tokens,
+        "total_tokens": config.prompt_tokens + config.completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": config.cached_tokens},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: FakeConfig = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers=()):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        latency, fail = self.config.draw()
+        if fail:
+            time.sleep(latency / 4)
+            self._send_json(
+                self.config.error_status,
+                {"error": {"message": "Simulated failure", "type": "fake_error"}},
+                [("Retry-After", str(self.config.retry_after))],
+            )
+            return
+
+        text = reply_text(body)
+        base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": body.get("model", "")}
+        if not body.get("stream"):
+            time.sleep(latency)
+            self._send_json(
+                200,
+                {
+                    **base,
+                    "object": "chat.completion",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": text},
+                        }
+                    ],
+                    "usage": _usage(self.config),
+                },
+            )
+            return
+
+        # Streaming: spread the latency over the chunks
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for piece in chunks:
+            time.sleep(latency / len(chunks))
+            event = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self.wfile.write(b"data: " + json.dumps(event).encode() + b"\n\n")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            event = {**base, "object": "chat.completion.chunk", "choices": [], "usage": _usage(self.config)}
+            self.wfile.write(b"data: " + json.dumps(event).encode() + b"\n\n")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def start_server(config: FakeConfig = None, host: str = "127.0.0.1", port: int = 0):
+    """Serve on a background thread; returns (server, base_url). port=0 picks a free port."""
+    handler = type("FakeOpenAIHandler", (_Handler,), {"config": config or FakeConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def add_server_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="median latency")
+    parser.add_argument("--latency-sigma", type=float, default=DEFAULT_LATENCY_SIGMA)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="0–1, share of failed requests")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--prompt-tokens", type=int, default=DEFAULT_PROMPT_TOKENS)
+    parser.add_argument("--cached-tokens", type=int, default=0)
+    parser.add_argument("--completion-tokens", type=int, default=DEFAULT_COMPLETION_TOKENS)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args) -> FakeConfig:
+    return FakeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        prompt_tokens=args.prompt_tokens,
+        cached_tokens=args.cached_tokens,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    add_server_args(parser)
+    args = parser.parse_args()
+    server, url = start_server(config_from_args(args), args.host, args.port)
+    print(f"Fake OpenAI API on {url} (set OPENAI_BASE_URL={url} OPENAI_API_KEY=fake)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Offline benchmark of the lead-qualification pipeline.
+
+Starts the fake OpenAI server, then for each size drives the real code
+paths (call_llm_meta on a thread pool, plain or streaming; call_safety_llm
+via run_safety_suite; scoring, run-store writes and export) and reports
+throughput, latency percentiles and peak RSS.
+
+    python -m benchmarks.run_bench --sizes 10 100 10000 --latency-ms 300
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_openai import add_server_args, config_from_args, start_server
+
+# =============================
+# SETTINGS
+# =============================
+DEFAULT_SIZES = (10, 100, 10_000)
+DEFAULT_WORKERS = 32
+BENCH_CLIENT = "Benchmark"
+BENCH_JOURNEY = "Fake API load test"
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(values):
+    from core.metrics import percentile
+
+    ordered = sorted(v for v in values if v is not None)
+    return {f"p{p}": percentile(ordered, p) for p in (50, 95, 99)}
+
+
+def _pct(count: int, total: int) -> float:
+    return count / total * 100 if total else 0.0
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+# =============================
+# STAGES
+# =============================
+def bench_leads(n: int, workers: int, stream: bool, structured: bool):
+    from core.data import SCENARIOS, call_llm_meta, build_lead_run, _map_concurrently
+
+    # A unique suffix per lead keeps the response cache out of the picture
+    leads = [
+        (name, f"{message} (lead #{i})", expected)
+        for i, (name, message, expected) in (
+            (i, SCENARIOS[i % len(SCENARIOS)]) for i in range(n)
+        )
+    ]
+
+    def _run_one(lead):
+        name, message, expected = lead
+        js, meta = call_llm_meta(
+            message,
+            show_errors=False,
+            use_cache=False,
+            structured=structured,
+            on_text=(lambda _text: None) if stream else None,
+        )
+        return build_lead_run(name, expected, js, meta)
+
+    rows, elapsed = _timed(lambda: _map_concurrently(_run_one, leads, workers))
+    fallbacks = sum(r["fallback"] for r in rows)
+    parse_failures = sum(1 for r in rows if r["parse_status"] not in ("ok", "missing_fields"))
+    return rows, {
+        "seconds": elapsed,
+        "per_sec": n / elapsed if elapsed else 0.0,
+        **_percentiles(r["latency_ms"] for r in rows),
+        "fallbacks": fallbacks,
+        "fallback_pct": _pct(fallbacks, n),
+        "parse_failures": parse_failures,
+        "parse_failure_pct": _pct(parse_failures, n),
+        "retries": sum(r["retries"] for r in rows),
+    }
+
+
+def bench_safety(n: int, workers: int):
+    from core.data import SAFETY_TESTS, run_safety_suite
+
+    tests = [
+        (name, category, f"{prompt} (case #{i})")
+        for i, (name, category, prompt) in (
+            (i, SAFETY_TESTS[i % len(SAFETY_TESTS)]) for i in range(n)
+        )
+    ]
+    rows, elapsed = _timed(
+        lambda: run_safety_suite(tests, max_workers=workers, use_cache=False)
+    )
+    fallbacks = sum(r["fallback"] for r in rows)
+    return rows, {
+        "seconds": elapsed,
+        "per_sec": n / elapsed if elapsed else 0.0,
+        **_percentiles(r["latency_ms"] for r in rows),
+        "passed": sum(r["pass"] for r in rows),
+        "fallbacks": fallbacks,
+        "fallback_pct": _pct(fallbacks, n),
+    }
+
+
+def bench_scoring(lead_rows, safety_rows):
+    from core.data import compute_scores, safety_passed_many
+    from core.metrics import ScoreAggregate
+
+    def _aggregate():
+        agg = ScoreAggregate()
+        for r in lead_rows:
+            agg.add_lead(r)
+        for r in safety_rows:
+            agg.add_safety(r)
+        return agg
+
+    _, full_scan = _timed(lambda: compute_scores(lead_rows, safety_rows))
+    _, incremental = _timed(_aggregate)
+    previews = [r["response_preview"] for r in safety_rows]
+    _, keyword_scan = _timed(lambda: safety_passed_many(previews))
+    return {
+        "compute_scores_ms": full_scan * 1000,
+        "aggregate_ms": incremental * 1000,
+        "safety_keywords_ms": keyword_scan * 1000,
+    }
+
+
+def bench_store_export(lead_rows, safety_rows, journey: str):
+    from core.export import parquet_available, spool_export
+    from core.store import RunStore
+
+    store = RunStore()
+    _, write_s = _timed(lambda: store.add_lead_runs(BENCH_CLIENT, journey, lead_rows))
+    store.set_safety_runs(BENCH_CLIENT, journey, safety_rows)
+    _, agg_s = _timed(lambda: RunStore(store.path).aggregate(BENCH_CLIENT, journey))
+
+    result = {"store_write_ms": write_s * 1000, "aggregate_rebuild_ms": agg_s * 1000}
+    formats = ["csv", "jsonl"] + (["parquet"] if parquet_available() else [])
+    for fmt in formats:
+        out, seconds = _timed(
+            lambda: spool_export(lambda: store.iter_lead_runs(BENCH_CLIENT, journey), fmt)
+        )
+        out.seek(0, os.SEEK_END)
+        result[f"export_{fmt}_ms"] = seconds * 1000
+        result[f"export_{fmt}_kb"] = out.tell() / 1024
+        out.close()
+    return result
+
+
+# =============================
+# REPORT
+# =============================
+def _fmt(value) -> str:
+    if value is None:
+        return "–"
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return f"{value:,}"
+
+
+def check_failures(result, error_rate: float):
+    """Problems that make a size's numbers meaningless.
+
+    The scheduler retries failed requests, so fallbacks or parse failures
+    above the fake server's own error rate mean calls are broken, not slow.
+    """
+    limit = error_rate * 100
+    problems = []
+    for stage, keys in (("leads", ("fallback_pct", "parse_failure_pct")), ("safety", ("fallback_pct",))):
+        for key in keys:
+            if result[stage][key] > limit:
+                problems.append(f"{stage} {key}={result[stage][key]:.1f}% > error rate {limit:.1f}%")
+    return problems
+
+
+def print_failures(size: int, problems):
+    banner = "!" * 72
+    print(f"\n{banner}\nBENCHMARK INVALID at {size:,} leads:", file=sys.stderr)
+    for problem in problems:
+        print(f"  {problem}", file=sys.stderr)
+    print("Throughput and latency above measure fallbacks, not model calls.", file=sys.stderr)
+    print(banner, file=sys.stderr)
+
+
+def print_report(results):
+    for res in results:
+        print(f"\n== {res['size']:,} leads  (peak RSS {res['peak_rss_mb']:.0f} MB)")
+        for stage in ("leads", "safety", "scoring", "store_export"):
+            cells = "  ".join(f"{k}={_fmt(v)}" for k, v in res[stage].items())
+            print(f"  {stage:<13} {cells}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--stream", action="store_true", help="use the streaming call path")
+    parser.add_argument("--structured", action="store_true", help="request JSON-schema output")
+    parser.add_argument("--rpm", type=float, default=1e9, help="scheduler requests/min limit")
+    parser.add_argument("--tpm", type=float, default=1e12, help="scheduler tokens/min limit")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    add_server_args(parser)
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(config_from_args(args))
+    # Must be set before the OpenAI client and stores are created
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ["TIER1_DATA_DIR"] = tempfile.mkdtemp(prefix="tier1-bench-")
+
+    from core.data import call_llm_meta, get_request_scheduler
+
+    get_request_scheduler().set_limits(args.rpm, args.tpm)
+    # Warm up the client and connection pool so the first size isn't skewed
+    _js, meta = call_llm_meta(
+        "Warm-up lead: founder, budget 20k, need this in 4 weeks.",
+        use_cache=False,
+        show_errors=False,
+    )
+    if meta["fallback"] and not args.error_rate:
+        server.shutdown()
+        raise SystemExit(
+            "Warm-up call fell back instead of reaching the fake API; "
+            "check the OpenAI client setup before benchmarking."
+        )
+
+    results = []
+    failed = False
+    for n in args.sizes:
+        lead_rows, leads = bench_leads(n, args.workers, args.stream, args.structured)
+        safety_rows, safety = bench_safety(n, args.workers)
+        results.append(
+            {
+                "size": n,
+                "leads": leads,
+                "safety": safety,
+                "scoring": bench_scoring(lead_rows, safety_rows),
+                "store_export": bench_store_export(lead_rows, safety_rows, f"{BENCH_JOURNEY} {n}"),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+        )
+        print_report(results[-1:])
+        problems = check_failures(results[-1], args.error_rate)
+        if problems:
+            failed = True
+            print_failures(n, problems)
+
+    server.shutdown()
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if failed:
+        raise SystemExit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# =============================
+# SETTINGS
+# =============================
+DATA_DIR = os.getenv("TIER1_DATA_DIR", ".tier1")
+CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite3")
+CACHE_MAX_ENTRIES = 5000
+CACHE_TTL_SECONDS = 7 * 24 * 3600  # one week
+# Several processes (API workers, the app, job workers) share the cache file
+CACHE_BUSY_TIMEOUT_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(payload: dict) -> str:
+    """Stable content hash of a full model request (model, messages, params)."""
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# =============================
+# RESPONSE CACHE
+# =============================
+class ResponseCache:
+    """SQLite-backed response cache with TTL expiry and LRU eviction.
+
+    Keys are request hashes, so any change to the system prompt, user text,
+    model or sampling params is a different entry. Each entry also keeps the
+    token usage and latency of the call that produced it, so a hit can
+    report what the reply cost to make. The cache is best effort:
+    a database error (e.g. the file is locked by another process for longer
+    than the busy timeout) is logged and treated as a miss / skipped write,
+    never as a failed model call.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=CACHE_BUSY_TIMEOUT_SECONDS
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                usage_json TEXT,
+                latency_ms REAL
+            )
+            """
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "usage_json" not in existing:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN usage_json TEXT")
+            self._conn.execute("ALTER TABLE responses ADD COLUMN latency_ms REAL")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _failed(self, action: str, error: Exception):
+        self.errors += 1
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+        logger.warning("Response cache %s failed: %s", action, error)
+
+    def get(self, key: str):
+        """Return the cached response text, or None on a miss / expired entry / error."""
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: str):
+        """(text, usage, latency_ms) of a cached response, or None.
+
+        usage / latency_ms are those of the original call (None if unknown).
+        """
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            with self._lock:
+                self.misses += 1
+                self._failed("read", e)
+            return None
+
+    def put(self, key: str, value: str, usage: dict = None, latency_ms: float = None):
+        """Store a response and what it cost; a failed write is logged and skipped."""
+        try:
+            self._put(key, value, json.dumps(usage) if usage else None, latency_ms)
+        except sqlite3.Error as e:
+            with self._lock:
+                self._failed("write", e)
+
+    def _get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, usage_json, latency_ms FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at, usage_json, latency_ms = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._entries -= 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            # The LRU touch is a write; losing it only ages the entry early
+            try:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._failed("touch", e)
+            return value, json.loads(usage_json) if usage_json else None, latency_ms
+
+    def _put(self, key: str, value: str, usage_json: str, latency_ms: float):
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE responses SET value = ?, created_at = ?, last_access = ?, "
+                "usage_json = ?, latency_ms = ? WHERE key = ?",
+                (value, now, now, usage_json, latency_ms, key),
+            )
+            if cur.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO responses "
+                    "(key, value, created_at, last_access, usage_json, latency_ms) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, value, now, now, usage_json, latency_ms),
+                )
+                self._entries += 1
+            if self._entries > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least-recently-used ones down to max_entries."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = self._entries - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+            self._entries -= overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._entries = 0
+            self.hits = 0
+            self.misses = 0
+            self.errors = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "entries": self._entries,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0,
+        }
@@ -0,0 +1,261 @@
+"""Vectorized scoring for large offline evaluations (NumPy / pandas).
+
+evaluate() gives the same numbers as the per-row path (score_tag,
+completeness, build_lead_run, compute_scores) for hundreds of thousands of
+runs: tags are factorized once and compared as integer codes, completeness
+is counted column by column, and sums are kept exact so shards from a
+process pool merge without drift.
+"""
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+from core.data import REQUIRED_FIELDS, gate_label, scores_from_aggregate
+from core.export import RAW_PREFIX
+from core.parsing import VALID_LEAD_TAGS
+
+# =============================
+# SETTINGS
+# =============================
+EVAL_SHARD_ROWS = 100_000
+# Below this a single process wins; shipping shards to workers costs more
+EVAL_MIN_PARALLEL_ROWS = 200_000
+
+TAG_COLUMNS = ("scenario", "expected", "predicted")
+
+# build_lead_run rounds completeness to 0.1%, so only these values occur
+_COMPLETENESS_PCT = np.array(
+    [round(k / len(REQUIRED_FIELDS) * 100, 1) for k in range(len(REQUIRED_FIELDS) + 1)]
+)
+
+
+# =============================
+# RESULT
+# =============================
+class Evaluation:
+    """Totals of an evaluation, mergeable across shards without rounding.
+
+    Attribute names follow ScoreAggregate, so scores_from_aggregate() turns
+    an Evaluation into the compute_scores() tuple.
+    """
+
+    def __init__(self):
+        self.lead_runs = 0
+        self.labeled_runs = 0
+        self.tag_correct = 0
+        self.false_hot = 0
+        self.completeness_sum = Fraction(0)
+        self.safety_runs = 0
+        self.safety_passed = 0
+        self.confusion = Counter()  # (scenario, expected, predicted) -> runs
+
+    def merge(self, other: "Evaluation"):
+        self.lead_runs += other.lead_runs
+        self.labeled_runs += other.labeled_runs
+        self.tag_correct += other.tag_correct
+        self.false_hot += other.false_hot
+        self.completeness_sum += other.completeness_sum
+        self.safety_runs += other.safety_runs
+        self.safety_passed += other.safety_passed
+        self.confusion.update(other.confusion)
+        return self
+
+    def scores(self):
+        """(acc, comp, safety, rel, run_count, safety_count, false_hot_rate)."""
+        return scores_from_aggregate(self)
+
+    def gate(self) -> str:
+        acc, comp, safety, rel, *_rest, false_hot_rate = self.scores()
+        return gate_label(rel, safety, false_hot_rate)
+
+    def confusion_matrix(self, scenario: str = None) -> pd.DataFrame:
+        """Expected × predicted run counts, for one scenario or all of them."""
+        counts = Counter()
+        for (s, expected, predicted), n in self.confusion.items():
+            if scenario is None or s == scenario:
+                counts[expected, predicted] += n
+        tags = list(VALID_LEAD_TAGS)
+        expected_tags = tags + sorted({e for e, _ in counts} - set(tags))
+        predicted_tags = tags + sorted({p for _, p in counts} - set(tags))
+        matrix = pd.DataFrame(0, index=expected_tags, columns=predicted_tags, dtype=np.int64)
+        for (expected, predicted), n in counts.items():
+            matrix.loc[expected, predicted] = n
+        matrix.index.name = "expected"
+        matrix.columns.name = "predicted"
+        return matrix
+
+    def by_scenario(self) -> pd.DataFrame:
+        """Runs, accuracy and false-HOT rate per scenario."""
+        table = {}
+        for (scenario, expected, predicted), n in self.confusion.items():
+            row = table.setdefault(
+                scenario, {"runs": 0, "labeled": 0, "tag_correct": 0, "false_hot": 0}
+            )
+            row["runs"] += n
+            if expected:
+                row["labeled"] += n
+                row["tag_correct"] += n * (expected.lower() == predicted.lower())
+                row["false_hot"] += n * (predicted == "Hot" and expected != "Hot")
+        frame = pd.DataFrame.from_dict(table, orient="index")
+        if frame.empty:
+            return frame
+        labeled = frame["labeled"].where(frame["labeled"] > 0)
+        frame["accuracy"] = (frame["tag_correct"] / labeled * 100).fillna(0.0)
+        frame["false_hot_rate"] = (frame["false_hot"] / labeled * 100).fillna(0.0)
+        frame.index.name = "scenario"
+        return frame.sort_index()
+
+
+# =============================
+# COLUMN LOADING
+# =============================
+def _text(series: pd.Series):
+    """Factorize a text column; None / NaN become "". Returns (codes, labels)."""
+    codes, uniques = pd.factorize(series)
+    labels = ["" if u is None else str(u) for u in uniques] + [""]
+    # NaN codes are -1, which now indexes the trailing ""
+    return codes % len(labels), labels
+
+
+def _field_column(field: str, frame: pd.DataFrame):
+    """Column holding a lead field; raw_json.* wins, since a plain "notes"
+    column in an export is the run's own notes, not the lead's."""
+    for col in (RAW_PREFIX + field, field):
+        if col in frame:
+            return col
+    return None
+
+
+def runs_frame(runs) -> pd.DataFrame:
+    """Only the columns scoring needs, from a DataFrame or run-log dicts.
+
+    Completeness comes from completeness_pct when present, otherwise from
+    the lead fields (plain or raw_json.* export columns, or raw_json dicts).
+    """
+    if isinstance(runs, pd.DataFrame):
+        if "completeness_pct" in runs:
+            keep = ["completeness_pct"]
+        else:
+            keep = [c for c in (_field_column(f, runs) for f in REQUIRED_FIELDS) if c]
+        return runs[[c for c in TAG_COLUMNS if c in runs] + keep]
+
+    runs = list(runs)
+    columns = {c: [r.get(c, "") for r in runs] for c in TAG_COLUMNS}
+    if runs and all("completeness_pct" in r for r in runs):
+        columns["completeness_pct"] = [r["completeness_pct"] for r in runs]
+    else:
+        raws = [r.get("raw_json") or r for r in runs]
+        for f in REQUIRED_FIELDS:
+            columns[f] = [raw.get(f) for raw in raws]
+    return pd.DataFrame(columns)
+
+
+def load_runs(path: str) -> pd.DataFrame:
+    """Read a run-log export (.csv, .jsonl or .parquet) for evaluation."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.endswith((".jsonl", ".json")):
+        return pd.read_json(path, lines=True, dtype=False)
+    # Keep strings like "NA" or "None" as text, as the per-row path would
+    return pd.read_csv(path, dtype=object, keep_default_na=False, na_values=[""])
+
+
+# =============================
+# SCORING
+# =============================
+def _collected_fields(frame: pd.DataFrame) -> np.ndarray:
+    """Per row, how many REQUIRED_FIELDS hold a non-blank string (as completeness())."""
+    collected = np.zeros(len(frame), dtype=np.int64)
+    for f in REQUIRED_FIELDS:
+        col = _field_column(f, frame)
+        if col is None:
+            continue
+        # Values repeat a lot: test each distinct one the way completeness() does
+        codes, uniques = pd.factorize(frame[col])
+        filled = [isinstance(v, str) and v.strip() != "" for v in uniques] + [False]
+        collected += np.array(filled)[codes]
+    return collected
+
+
+def _exact_sum(values: np.ndarray) -> Fraction:
+    """Exact sum of floats; values repeat a lot, so sum each distinct one once."""
+    distinct, counts = np.unique(values, return_counts=True)
+    return sum((Fraction(float(v)) * int(n) for v, n in zip(distinct, counts)), Fraction(0))
+
+
+def evaluate_shard(frame: pd.DataFrame) -> Evaluation:
+    """Score one block of runs in bulk."""
+    result = Evaluation()
+    n = len(frame)
+    result.lead_runs = n
+    if not n:
+        return result
+
+    exp_codes, exp_labels = _text(frame["expected"] if "expected" in frame else pd.Series([""] * n))
+    pred_codes, pred_labels = _text(
+        frame["predicted"] if "predicted" in frame else pd.Series([""] * n)
+    )
+    # Case-insensitive tag ids in one vocabulary, as score_tag() compares
+    vocab = {}
+    exp_lower = np.array([vocab.setdefault(t.lower(), len(vocab)) for t in exp_labels])[exp_codes]
+    pred_lower = np.array([vocab.setdefault(t.lower(), len(vocab)) for t in pred_labels])[pred_codes]
+    labeled = np.array([t != "" for t in exp_labels])[exp_codes]
+    exp_hot = np.array([t == "Hot" for t in exp_labels])[exp_codes]
+    pred_hot = np.array([t == "Hot" for t in pred_labels])[pred_codes]
+
+    result.labeled_runs = int(labeled.sum())
+    result.tag_correct = int((labeled & (exp_lower == pred_lower)).sum())
+    result.false_hot = int((labeled & pred_hot & ~exp_hot).sum())
+
+    if "completeness_pct" in frame:
+        pct = frame["completeness_pct"].to_numpy(dtype=float)
+    else:
+        pct = _COMPLETENESS_PCT[_collected_fields(frame)]
+    result.completeness_sum = _exact_sum(pct)
+
+    if "scenario" in frame:
+        scen_codes, scen_labels = _text(frame["scenario"])
+    else:
+        scen_codes, scen_labels = np.zeros(n, dtype=np.int64), [""]
+    keys = (scen_codes * len(exp_labels) + exp_codes) * len(pred_labels) + pred_codes
+    distinct, counts = np.unique(keys, return_counts=True)
+    for key, count in zip(distinct.tolist(), counts.tolist()):
+        rest, p = divmod(key, len(pred_labels))
+        s, e = divmod(rest, len(exp_labels))
+        result.confusion[scen_labels[s], exp_labels[e], pred_labels[p]] += count
+    return result
+
+
+def evaluate(
+    runs,
+    safety_runs=(),
+    workers: int = None,
+    shard_rows: int = EVAL_SHARD_ROWS,
+) -> Evaluation:
+    """Score runs (DataFrame or run-log dicts) in bulk, sharded over processes.
+
+    `workers` defaults to the CPU count; small inputs stay in-process.
+    Scores match compute_scores() on the same runs exactly.
+    """
+    frame = runs_frame(runs)
+    workers = workers or os.cpu_count() or 1
+    n = len(frame)
+    if workers > 1 and n >= EVAL_MIN_PARALLEL_ROWS:
+        shards = [frame.iloc[i:i + shard_rows] for i in range(0, n, shard_rows)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            parts = list(pool.map(evaluate_shard, shards))
+    else:
+        parts = [evaluate_shard(frame)]
+
+    result = Evaluation()
+    for part in parts:
+        result.merge(part)
+    safety_runs = list(safety_runs)
+    result.safety_runs = len(safety_runs)
+    result.safety_passed = sum(r["pass"] for r in safety_runs)
+    return result
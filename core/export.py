@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import tempfile
+
+# =============================
+# SETTINGS
+# =============================
+EXPORT_CHUNK_ROWS = 500
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # larger exports spill to a temp file
+RAW_PREFIX = "raw_json."
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# =============================
+# ROW SHAPING
+# =============================
+def flatten_run(row: dict) -> dict:
+    """Run-log row with raw_json fields lifted to top-level raw_json.* keys."""
+    flat = {k: v for k, v in row.items() if k != "raw_json"}
+    raw = row.get("raw_json") or {}
+    if isinstance(raw, dict):
+        for k, v in raw.items():
+            flat[RAW_PREFIX + k] = v
+    return flat
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def scan_fields(rows_factory):
+    """First pass: union of flattened keys (first-seen order) and their value types."""
+    fields = {}
+    for row in rows_factory():
+        for k, v in flatten_run(row).items():
+            types = fields.setdefault(k, set())
+            if v is not None:
+                types.add(type(v))
+    return fields
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# =============================
+# STREAMING WRITERS
+# =============================
+def iter_csv_chunks(rows_factory, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the run log as UTF-8 CSV, one chunk of rows at a time.
+
+    `rows_factory()` must return a fresh iterator of run rows; it is called
+    twice (once to collect the header, once to write).
+    """
+    fieldnames = list(scan_fields(rows_factory))
+    if not fieldnames:
+        return
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fieldnames)
+    writer.writeheader()
+    for chunk in _chunks(rows_factory(), chunk_rows):
+        for row in chunk:
+            flat = flatten_run(row)
+            writer.writerow({k: _cell(flat.get(k, "")) for k in fieldnames})
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+
+
+def iter_jsonl_chunks(rows_factory, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the run log as JSON Lines (flattened raw_json fields), chunk by chunk."""
+    for chunk in _chunks(rows_factory(), chunk_rows):
+        lines = [json.dumps(flatten_run(row), ensure_ascii=False) for row in chunk]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _arrow_type(pa, types: set):
+    if types and types <= {bool}:
+        return pa.bool_()
+    if types and types <= {int, bool}:
+        return pa.int64()
+    if types and types <= {int, float, bool}:
+        return pa.float64()
+    return pa.string()
+
+
+def write_parquet(rows_factory, sink, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Write the run log to `sink` as Parquet, one row group per chunk.
+
+    Requires pyarrow; column types come from a first pass over the rows.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = scan_fields(rows_factory)
+    if not fields:
+        return
+    schema = pa.schema([(k, _arrow_type(pa, types)) for k, types in fields.items()])
+    string_cols = {f.name for f in schema if pa.types.is_string(f.type)}
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in _chunks(rows_factory(), chunk_rows):
+            columns = {k: [] for k in fields}
+            for row in chunk:
+                flat = flatten_run(row)
+                for k in fields:
+                    v = flat.get(k)
+                    if k in string_cols and v is not None and not isinstance(v, str):
+                        v = json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)
+                    columns[k].append(v)
+            writer.write_table(pa.table(columns, schema=schema))
+
+
+def spool_export(rows_factory, fmt: str):
+    """Export to a spooled temp file (in memory up to SPOOL_MAX_BYTES) and rewind it."""
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    if fmt == "parquet":
+        write_parquet(rows_factory, out)
+    else:
+        chunks = iter_jsonl_chunks(rows_factory) if fmt == "jsonl" else iter_csv_chunks(rows_factory)
+        for chunk in chunks:
+            out.write(chunk)
+    out.seek(0)
+    return out
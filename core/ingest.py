@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+import time
+
+from core.data import (
+    BATCH_MAX_WORKERS,
+    log_lead_runs,
+    run_scenarios_batch,
+    validate_lead_message,
+)
+
+# =============================
+# SETTINGS
+# =============================
+IMPORT_CHUNK_SIZE = 25
+
+# Accepted column / key names, first match wins
+MESSAGE_KEYS = ("message", "lead_message", "text", "inbound_message")
+EXPECTED_KEYS = ("expected", "expected_tag", "lead_tag", "tag")
+SCENARIO_KEYS = ("scenario", "name", "lead_id", "id")
+VALID_TAGS = {"hot": "Hot", "warm": "Warm", "cold": "Cold"}
+
+
+def _first(record: dict, keys) -> str:
+    for k in keys:
+        v = record.get(k)
+        if v is not None and str(v).strip() != "":
+            return str(v).strip()
+    return ""
+
+
+# =============================
+# STREAMING PARSERS
+# =============================
+def iter_lead_records(fileobj, filename: str):
+    """Yield (row_number, record_dict_or_None, error) one row at a time.
+
+    `fileobj` is a binary file (e.g. a Streamlit UploadedFile); CSV is read
+    with a header row, anything ending in .jsonl/.json as one object per line.
+    """
+    fileobj.seek(0)
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        if filename.lower().endswith((".jsonl", ".json", ".ndjson")):
+            for row_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield row_no, None, f"Invalid JSON ({e.msg})."
+                    continue
+                if not isinstance(record, dict):
+                    yield row_no, None, "Each line must be a JSON object."
+                    continue
+                yield row_no, record, ""
+        else:
+            reader = csv.DictReader(text)
+            for row_no, record in enumerate(reader, start=1):
+                yield row_no, record, ""
+    finally:
+        # Leave the underlying upload open for a later resume
+        text.detach()
+
+
+def iter_leads(fileobj, filename: str):
+    """Yield (row_number, (scenario, message, expected) or None, error) per row."""
+    for row_no, record, error in iter_lead_records(fileobj, filename):
+        if error:
+            yield row_no, None, error
+            continue
+
+        if not any(k in record for k in MESSAGE_KEYS):
+            yield row_no, None, f"No message column (expected one of: {', '.join(MESSAGE_KEYS)})."
+            continue
+        message = _first(record, MESSAGE_KEYS)
+        valid, err = validate_lead_message(message)
+        if not valid:
+            yield row_no, None, err
+            continue
+
+        raw_tag = _first(record, EXPECTED_KEYS)
+        expected = VALID_TAGS.get(raw_tag.lower(), "") if raw_tag else ""
+        if raw_tag and not expected:
+            yield row_no, None, f"Unknown expected tag '{raw_tag}' (use Hot, Warm or Cold)."
+            continue
+
+        scenario = _first(record, SCENARIO_KEYS) or f"{filename} #{row_no}"
+        yield row_no, (scenario, message, expected), ""
+
+
+# =============================
+# CHUNKED IMPORT
+# =============================
+def import_leads(
+    fileobj,
+    filename: str,
+    use_fake: bool = False,
+    start_row: int = 0,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    max_workers: int = BATCH_MAX_WORKERS,
+    on_chunk=None,
+    log_runs=log_lead_runs,
+    **llm_options,
+):
+    """Qualify an uploaded lead file chunk by chunk and log each chunk.
+
+    Rows up to `start_row` are skipped, so an interrupted import can resume.
+    After each chunk is written `on_chunk(stats)` is called; stats["row"] is
+    the last row that is safely in the run log. `log_runs(runs)` writes a
+    chunk (default: the sidebar's sprint). `llm_options` are passed on to
+    run_scenarios_batch.
+    """
+    stats = {
+        "row": start_row,
+        "logged": 0,
+        "invalid": [],
+        "elapsed": 0.0,
+        "leads_per_sec": 0.0,
+    }
+    started = time.perf_counter()
+    chunk = []
+    last_row = start_row
+
+    def _flush():
+        if chunk:
+            runs = run_scenarios_batch(
+                chunk,
+                use_fake=use_fake,
+                max_workers=max_workers,
+                **llm_options,
+            )
+            log_runs(runs)
+            stats["logged"] += len(runs)
+            chunk.clear()
+        stats["row"] = last_row
+        stats["elapsed"] = time.perf_counter() - started
+        stats["leads_per_sec"] = stats["logged"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        if on_chunk:
+            on_chunk(stats)
+
+    for row_no, lead, error in iter_leads(fileobj, filename):
+        if row_no <= start_row:
+            continue
+        last_row = row_no
+        if error:
+            stats["invalid"].append((row_no, error))
+        else:
+            chunk.append(lead)
+        if len(chunk) >= chunk_size:
+            _flush()
+
+    _flush()
+    return stats
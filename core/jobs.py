@@ -0,0 +1,566 @@
+"""Background jobs: a SQLite-backed queue plus worker threads.
+
+Pages submit qualification, safety, bulk-import and model-sweep jobs and
+poll their progress (and partial results), so long model work neither
+blocks the script thread nor dies when a widget reruns the page. Workers
+run in the Streamlit process by default; set TIER1_JOB_WORKERS=0 and run
+`python -m core.jobs` for a separate worker process on the same queue.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import streamlit as st
+
+from core.cache import DATA_DIR
+from core.data import (
+    BATCH_MAX_WORKERS,
+    SAFETY_TESTS,
+    get_run_store,
+    run_safety_suite,
+    run_scenarios_batch,
+)
+from core.ingest import IMPORT_CHUNK_SIZE, import_leads, iter_leads
+from core.sweep import SWEEP_MAX_ARMS, run_sweep, sweep_arms
+
+logger = logging.getLogger(__name__)
+
+# =============================
+# SETTINGS
+# =============================
+JOBS_PATH = os.path.join(DATA_DIR, "jobs.sqlite3")
+# Uploaded lead files wait here for a worker (possibly another process)
+IMPORTS_DIR = os.path.join(DATA_DIR, "imports")
+JOB_WORKERS = int(os.getenv("TIER1_JOB_WORKERS", "2"))  # 0 = no in-process workers
+JOB_POLL_SECONDS = 0.5  # idle workers check the queue this often
+
+JOB_LEADS = "leads"
+JOB_SAFETY = "safety"
+JOB_IMPORT = "import"
+JOB_SWEEP = "sweep"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+JOB_COLUMNS = (
+    "id", "kind", "client", "journey", "status", "params_json", "total", "done",
+    "message", "result_json", "error", "cancel_requested", "worker_pid",
+    "created_at", "started_at", "finished_at", "partial_json",
+)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once a cancel has been requested."""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# =============================
+# QUEUE
+# =============================
+class JobQueue:
+    """Job table shared by every session and worker process (SQLite, WAL).
+
+    claim() takes the oldest queued job in an IMMEDIATE transaction, so
+    several worker threads or processes never run the same job.
+    """
+
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit; claim() opens its own transaction
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                client TEXT NOT NULL,
+                journey TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params_json TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                result_json TEXT,
+                error TEXT NOT NULL DEFAULT '',
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                worker_pid INTEGER,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                partial_json TEXT
+            )
+            """
+        )
+        # Queues created before partial results existed
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "partial_json" not in existing:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN partial_json TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)"
+        )
+
+    @staticmethod
+    def _row(values) -> dict:
+        job = dict(zip(JOB_COLUMNS, values))
+        job["params"] = json.loads(job.pop("params_json"))
+        blob = job.pop("result_json")
+        job["result"] = json.loads(blob) if blob else None
+        blob = job.pop("partial_json")
+        job["partial"] = json.loads(blob) if blob else None
+        return job
+
+    def _select(self, where: str, params=()):
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE {where}", params
+            ).fetchall()
+
+    def submit(self, kind: str, client: str, journey: str, params: dict, total: int) -> int:
+        """Queue a job; returns its id."""
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (kind, client, journey, status, params_json, total, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, client, journey, QUEUED, json.dumps(params), total, time.time()),
+            )
+            return cur.lastrowid
+
+    def get(self, job_id: int):
+        rows = self._select("id = ?", (job_id,))
+        return self._row(rows[0]) if rows else None
+
+    def jobs(self, client: str, journey: str, kind: str = None, limit: int = 10):
+        """A sprint's most recent jobs, newest first."""
+        where, params = "client = ? AND journey = ?", [client, journey]
+        if kind:
+            where += " AND kind = ?"
+            params.append(kind)
+        rows = self._select(f"{where} ORDER BY id DESC LIMIT ?", (*params, limit))
+        return [self._row(r) for r in rows]
+
+    def active_job(self, client: str, journey: str, kind: str):
+        """The sprint's newest queued or running job of this kind, else None."""
+        rows = self._select(
+            "client = ? AND journey = ? AND kind = ? AND status IN (?, ?) ORDER BY id DESC LIMIT 1",
+            (client, journey, kind, *ACTIVE),
+        )
+        return self._row(rows[0]) if rows else None
+
+    def cancel(self, job_id: int):
+        """Cancel a queued job now, or ask a running one to stop at its next check."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING),
+            )
+
+    def cancel_requested(self, job_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def claim(self):
+        """Mark the oldest queued job as running by this process and return it."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE status = ? "
+                    "ORDER BY id LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker_pid = ?, started_at = ? WHERE id = ?",
+                        (RUNNING, os.getpid(), time.time(), row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = self._row(row)
+        job["status"] = RUNNING
+        return job
+
+    def progress(self, job_id: int, done: int, message: str = "", partial=None):
+        """Record progress; `partial` (JSON) is what the job has produced so far."""
+        with self._lock:
+            if partial is None:
+                self._conn.execute(
+                    "UPDATE jobs SET done = ?, message = ? WHERE id = ?", (done, message, job_id)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET done = ?, message = ?, partial_json = ? WHERE id = ?",
+                    (done, message, json.dumps(partial), job_id),
+                )
+
+    def finish(self, job_id: int, status: str, result=None, error: str = ""):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result_json = ?, error = ?, finished_at = ? "
+                "WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def fail_orphaned(self) -> int:
+        """Fail running jobs whose worker process is gone (e.g. after a restart)."""
+        running = [self._row(r) for r in self._select("status = ?", (RUNNING,))]
+        orphaned = [
+            job["id"]
+            for job in running
+            if not job["worker_pid"] or not _pid_alive(job["worker_pid"])
+        ]
+        for job_id in orphaned:
+            self.finish(job_id, FAILED, error="Interrupted: the worker process stopped.")
+        return len(orphaned)
+
+
+# =============================
+# JOB RUNNERS
+# =============================
+def submit_lead_job(
+    queue: JobQueue,
+    client: str,
+    journey: str,
+    leads,
+    use_fake: bool = False,
+    max_workers: int = BATCH_MAX_WORKERS,
+    **llm_options,
+) -> int:
+    """Queue (scenario, message, expected) leads for qualification and logging."""
+    leads = [list(lead) for lead in leads]
+    params = {
+        "leads": leads,
+        "use_fake": use_fake,
+        "max_workers": max_workers,
+        "llm_options": llm_options,
+    }
+    return queue.submit(JOB_LEADS, client, journey, params, len(leads))
+
+
+def submit_safety_job(
+    queue: JobQueue,
+    client: str,
+    journey: str,
+    tests=SAFETY_TESTS,
+    use_fake: bool = False,
+    max_workers: int = BATCH_MAX_WORKERS,
+    use_cache: bool = True,
+) -> int:
+    """Queue a red-team suite run; it is recorded only if it completes."""
+    tests = [list(test) for test in tests]
+    params = {
+        "tests": tests,
+        "use_fake": use_fake,
+        "max_workers": max_workers,
+        "use_cache": use_cache,
+    }
+    return queue.submit(JOB_SAFETY, client, journey, params, len(tests))
+
+
+def submit_import_job(
+    queue: JobQueue,
+    client: str,
+    journey: str,
+    fileobj,
+    filename: str,
+    start_row: int = 0,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    use_fake: bool = False,
+    max_workers: int = BATCH_MAX_WORKERS,
+    **llm_options,
+) -> int:
+    """Queue an uploaded lead file for a chunked import from `start_row` on.
+
+    The file is copied to IMPORTS_DIR so any worker can read it; the job
+    deletes the copy when it ends.
+    """
+    os.makedirs(IMPORTS_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=IMPORTS_DIR, suffix=os.path.splitext(filename)[1])
+    fileobj.seek(0)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(fileobj, out)
+    with open(path, "rb") as f:
+        total = max((row_no for row_no, _lead, _error in iter_leads(f, filename)), default=0)
+    params = {
+        "path": path,
+        "filename": filename,
+        "start_row": start_row,
+        "chunk_size": chunk_size,
+        "use_fake": use_fake,
+        "max_workers": max_workers,
+        "llm_options": llm_options,
+    }
+    return queue.submit(JOB_IMPORT, client, journey, params, total)
+
+
+def submit_sweep_job(
+    queue: JobQueue,
+    client: str,
+    journey: str,
+    models,
+    temperatures,
+    use_fake: bool = False,
+    max_arms: int = SWEEP_MAX_ARMS,
+    max_workers: int = BATCH_MAX_WORKERS,
+    **llm_options,
+) -> int:
+    """Queue a model × temperature sweep; its runs come back in the result."""
+    params = {
+        "models": list(models),
+        "temperatures": list(temperatures),
+        "use_fake": use_fake,
+        "max_arms": max_arms,
+        "max_workers": max_workers,
+        "llm_options": llm_options,
+    }
+    return queue.submit(JOB_SWEEP, client, journey, params, len(models) * len(temperatures))
+
+
+def _run_lead_job(queue: JobQueue, job: dict) -> dict:
+    """Qualify in chunks of one wave (max_workers leads), logging each chunk.
+
+    Cancellation is checked between chunks, so a cancelled job stops after
+    at most one more round of calls and keeps the runs already logged.
+    """
+    p = job["params"]
+    leads = [tuple(lead) for lead in p["leads"]]
+    chunk_size = max(1, int(p["max_workers"]))
+    store = get_run_store()
+    done = correct = 0
+    last = None
+    for start in range(0, len(leads), chunk_size):
+        if queue.cancel_requested(job["id"]):
+            raise JobCancelled()
+
+        def _on_progress(n, _total, row, offset=done):
+            queue.progress(
+                job["id"], offset + n, f"{row['scenario']}: {row['predicted'] or 'N/A'}"
+            )
+
+        rows = run_scenarios_batch(
+            leads[start:start + chunk_size],
+            use_fake=p["use_fake"],
+            max_workers=p["max_workers"],
+            on_progress=_on_progress,
+            **p["llm_options"],
+        )
+        store.add_lead_runs(job["client"], job["journey"], rows)
+        done += len(rows)
+        correct += sum(r["tag_correct"] for r in rows)
+        last = rows[-1]
+    return {
+        "runs": done,
+        "tag_correct": correct,
+        "last_json": last["raw_json"] if last else None,
+        "last_tag": last["predicted"] if last else "",
+    }
+
+
+def _run_safety_job(queue: JobQueue, job: dict) -> dict:
+    p = job["params"]
+    seen = []
+
+    def _on_result(n, _total, row):
+        # Enough for the page to draw the per-category rollup while it runs
+        seen.append({"test": row["test"], "category": row["category"], "pass": row["pass"]})
+        queue.progress(
+            job["id"], n, f"{row['test']}: {'pass' if row['pass'] else 'FAIL'}", partial=seen
+        )
+
+    rows = run_safety_suite(
+        [tuple(test) for test in p["tests"]],
+        use_fake=p["use_fake"],
+        max_workers=p["max_workers"],
+        use_cache=p["use_cache"],
+        on_result=_on_result,
+    )
+    # A partial suite would misstate the safety score, so cancel discards it
+    if queue.cancel_requested(job["id"]):
+        raise JobCancelled()
+    get_run_store().set_safety_runs(job["client"], job["journey"], rows)
+    return {"passed": sum(r["pass"] for r in rows), "total": len(rows)}
+
+
+def _run_import_job(queue: JobQueue, job: dict) -> dict:
+    """import_leads into the job's sprint; the row cursor is the job's progress.
+
+    Cancellation is checked after each logged chunk, so partial["row"] is
+    always a safe point to resume from.
+    """
+    p = job["params"]
+    store = get_run_store()
+
+    def _on_chunk(stats):
+        queue.progress(
+            job["id"],
+            stats["row"],
+            f"{stats['logged']} leads logged • {len(stats['invalid'])} invalid • "
+            f"{stats['leads_per_sec']:.1f} leads/sec",
+            partial={k: stats[k] for k in ("row", "logged", "invalid")},
+        )
+        if queue.cancel_requested(job["id"]):
+            raise JobCancelled()
+
+    try:
+        with open(p["path"], "rb") as f:
+            return import_leads(
+                f,
+                p["filename"],
+                use_fake=p["use_fake"],
+                start_row=p["start_row"],
+                chunk_size=p["chunk_size"],
+                max_workers=p["max_workers"],
+                on_chunk=_on_chunk,
+                log_runs=lambda runs: store.add_lead_runs(job["client"], job["journey"], runs),
+                **p["llm_options"],
+            )
+    finally:
+        os.remove(p["path"])
+
+
+def _run_sweep_job(queue: JobQueue, job: dict) -> dict:
+    p = job["params"]
+
+    def _on_arm_done(done, _total, arm):
+        queue.progress(job["id"], done, arm.label)
+        if queue.cancel_requested(job["id"]):
+            raise JobCancelled()
+
+    arms = run_sweep(
+        sweep_arms(p["models"], p["temperatures"]),
+        use_fake=p["use_fake"],
+        max_arms=p["max_arms"],
+        max_workers=p["max_workers"],
+        on_arm_done=_on_arm_done,
+        **p["llm_options"],
+    )
+    return {"arms": [arm.to_result() for arm in arms]}
+
+
+JOB_RUNNERS = {
+    JOB_LEADS: _run_lead_job,
+    JOB_SAFETY: _run_safety_job,
+    JOB_IMPORT: _run_import_job,
+    JOB_SWEEP: _run_sweep_job,
+}
+
+
+def execute_job(queue: JobQueue, job: dict):
+    """Run one claimed job and record how it ended."""
+    try:
+        result = JOB_RUNNERS[job["kind"]](queue, job)
+    except JobCancelled:
+        queue.finish(job["id"], CANCELLED)
+    except Exception as e:
+        queue.finish(job["id"], FAILED, error=f"{type(e).__name__}: {e}")
+    else:
+        queue.finish(job["id"], DONE, result)
+
+
+# =============================
+# WORKERS
+# =============================
+class JobWorkers:
+    """Daemon threads that claim and run jobs until stop() is called."""
+
+    def __init__(self, queue: JobQueue, workers: int = JOB_WORKERS):
+        self.queue = queue
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._stop.wait(JOB_POLL_SECONDS)
+                continue
+            execute_job(self.queue, job)
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue, with JOB_WORKERS worker threads attached."""
+    queue = JobQueue()
+    queue.fail_orphaned()
+    if JOB_WORKERS > 0:
+        # Daemon threads; they live as long as the process
+        JobWorkers(queue, JOB_WORKERS).start()
+    return queue
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+    queue = JobQueue()
+    queue.fail_orphaned()
+    workers = JobWorkers(queue, args.workers).start()
+    logger.info("%d job workers on %s", args.workers, queue.path)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        workers.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import math
+from fractions import Fraction
+
+from core.parsing import PARSE_FAILURES
+
+# =============================
+# SETTINGS
+# =============================
+# Latency buckets grow by 2%, so a reported percentile is within 1% of the
+# exact one; 1 ms .. 10 min fits in about 670 buckets
+LATENCY_BUCKET_GROWTH = 1.02
+LATENCY_MIN_MS = 0.1
+
+
+class LatencyHistogram:
+    """Run counts per log-spaced latency bucket.
+
+    Adding or removing a run is O(1); percentiles walk the few hundred
+    occupied buckets and are cached until the next change.
+    """
+
+    def __init__(self):
+        self.counts = {}  # bucket index -> runs
+        self.total = 0
+        self._summary = None
+
+    @staticmethod
+    def _bucket(latency_ms: float) -> int:
+        return math.floor(math.log(max(latency_ms, LATENCY_MIN_MS), LATENCY_BUCKET_GROWTH))
+
+    @staticmethod
+    def _value(bucket: int) -> float:
+        # Geometric middle of the bucket
+        return round(LATENCY_BUCKET_GROWTH ** (bucket + 0.5), 1)
+
+    def add(self, latency_ms: float, sign: int = 1):
+        bucket = self._bucket(latency_ms)
+        count = self.counts.get(bucket, 0) + sign
+        if count > 0:
+            self.counts[bucket] = count
+        else:
+            self.counts.pop(bucket, None)
+        self.total += sign
+        self._summary = None
+
+    def percentiles(self, pcts=(50, 95, 99)) -> dict:
+        """Nearest-rank percentiles as {pct: ms} (None when empty)."""
+        ranks = {p: max(1, -(-self.total * p // 100)) for p in pcts}  # ceil
+        found = dict.fromkeys(pcts)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            for p, rank in ranks.items():
+                if found[p] is None and seen >= rank:
+                    found[p] = self._value(bucket)
+            if seen >= max(ranks.values(), default=0):
+                break
+        return found
+
+    def summary(self) -> dict:
+        if self._summary is None:
+            p = self.percentiles()
+            self._summary = {
+                "timed_runs": self.total,
+                "p50_ms": p[50],
+                "p95_ms": p[95],
+                "p99_ms": p[99],
+            }
+        return self._summary
+
+
+class ScoreAggregate:
+    """Running totals behind compute_scores, updated in O(1) per run.
+
+    Completeness is summed as an exact Fraction so adding and removing runs
+    never drifts; float(completeness_sum) equals math.fsum over the same runs.
+    """
+
+    def __init__(self):
+        self.lead_runs = 0
+        self.labeled_runs = 0
+        self.tag_correct = 0
+        self.false_hot = 0
+        self.completeness_sum = Fraction(0)
+        self.parse_failures = 0
+        self.usage = {
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": Fraction(0),
+        }
+        self.latencies = LatencyHistogram()  # runs that made a call
+        self.fallbacks = 0
+        self.retries = 0
+        self.safety_runs = 0
+        self.safety_passed = 0
+        self.by_tag = {}
+        self._latency_summary = None  # frozen percentiles of a snapshot
+
+    # ---------- lead runs ----------
+    def _apply_lead(self, row: dict, sign: int):
+        correct = row["tag_correct"]
+        false_hot = row.get("false_hot") or 0
+        comp = Fraction(row["completeness_pct"])
+
+        self.lead_runs += sign
+        if row.get("expected"):
+            self.labeled_runs += sign
+        self.tag_correct += sign * correct
+        self.false_hot += sign * false_hot
+        self.completeness_sum += sign * comp
+        if row.get("parse_status") in PARSE_FAILURES:
+            self.parse_failures += sign
+        for k in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+            self.usage[k] += sign * (row.get(k) or 0)
+        self.usage["cost_usd"] += sign * Fraction(row.get("cost_usd") or 0)
+        self.fallbacks += sign * (row.get("fallback") or 0)
+        self.retries += sign * (row.get("retries") or 0)
+        latency = row.get("latency_ms")
+        if latency is not None:
+            self.latencies.add(latency, sign)
+
+        tag = row.get("predicted", "")
+        self.by_tag[tag] = self.by_tag.get(tag, 0) + sign
+        if self.by_tag[tag] == 0:
+            del self.by_tag[tag]
+
+    def add_lead(self, row: dict):
+        self._apply_lead(row, 1)
+
+    def remove_lead(self, row: dict):
+        self._apply_lead(row, -1)
+
+    # ---------- safety runs ----------
+    def add_safety(self, row: dict):
+        self.safety_runs += 1
+        self.safety_passed += row["pass"]
+
+    def reset_safety(self):
+        self.safety_runs = 0
+        self.safety_passed = 0
+
+    def latency_summary(self) -> dict:
+        """Count and p50 / p95 / p99 (within 1%) of lead-run latencies."""
+        if self._latency_summary is not None:
+            return self._latency_summary
+        return self.latencies.summary()
+
+    def snapshot(self) -> "ScoreAggregate":
+        """Read-only copy of the totals for callers outside the store lock.
+
+        The latency histogram is not copied, only its percentiles, so a
+        snapshot cannot add or remove runs.
+        """
+        other = ScoreAggregate()
+        other.lead_runs = self.lead_runs
+        other.labeled_runs = self.labeled_runs
+        other.tag_correct = self.tag_correct
+        other.false_hot = self.false_hot
+        other.completeness_sum = self.completeness_sum
+        other.parse_failures = self.parse_failures
+        other.usage = dict(self.usage)
+        other.latencies = None
+        other._latency_summary = self.latency_summary()
+        other.fallbacks = self.fallbacks
+        other.retries = self.retries
+        other.safety_runs = self.safety_runs
+        other.safety_passed = self.safety_passed
+        other.by_tag = dict(self.by_tag)
+        return other
+
+
+def percentile(sorted_values, pct: float):
+    """Nearest-rank percentile of an ascending list (None if empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def telemetry_summary(agg: ScoreAggregate) -> dict:
+    """Latency percentiles, tokens per lead and fallback / retry rates."""
+    runs = agg.lead_runs
+    tokens = agg.usage["prompt_tokens"] + agg.usage["completion_tokens"]
+    return {
+        **agg.latency_summary(),
+        "tokens_per_lead": tokens / runs if runs else 0.0,
+        "fallback_rate": agg.fallbacks / runs * 100 if runs else 0.0,
+        "retries_per_lead": agg.retries / runs if runs else 0.0,
+    }
+
+
+class MetricsSnapshot:
+    """Sprint metrics for one run-store version, shared by every panel in a rerun."""
+
+    def __init__(
+        self,
+        key,
+        scores,
+        gate: str,
+        tag_counts: dict,
+        parse_failures: int = 0,
+        usage: dict = None,
+        telemetry: dict = None,
+    ):
+        (
+            self.accuracy,
+            self.completeness,
+            self.safety,
+            self.reliability,
+            self.run_count,
+            self.safety_count,
+            self.false_hot_rate,
+        ) = scores
+        self.key = key
+        self.gate = gate
+        self.tag_counts = dict(tag_counts)
+        self.parse_failures = parse_failures
+        # Sprint token totals; cost_usd as a float
+        self.usage = {k: float(v) if k == "cost_usd" else v for k, v in (usage or {}).items()}
+        self.telemetry = dict(telemetry or {})
+
+    @property
+    def logged_runs(self) -> int:
+        # run_count holds demo placeholders when the sprint is empty
+        return sum(self.tag_counts.values())
+
+    @property
+    def has_lead_runs(self) -> bool:
+        return self.logged_runs > 0
+
+    @property
+    def parse_failure_rate(self) -> float:
+        """% of logged lead runs whose model reply could not be parsed."""
+        runs = self.logged_runs
+        return self.parse_failures / runs * 100 if runs else 0.0
+
+    def usage_per_run(self) -> dict:
+        """Average tokens and cost per logged lead run."""
+        runs = self.logged_runs
+        return {k: v / runs if runs else 0 for k, v in self.usage.items()}
+
+    def scores(self):
+        """Same tuple shape as compute_scores()."""
+        return (
+            self.accuracy,
+            self.completeness,
+            self.safety,
+            self.reliability,
+            self.run_count,
+            self.safety_count,
+            self.false_hot_rate,
+        )
@@ -0,0 +1,192 @@
+import json
+import re
+
+# =============================
+# PARSE STATUSES
+# =============================
+PARSE_OK = "ok"
+PARSE_MISSING_FIELDS = "missing_fields"  # usable tag, some schema keys absent
+PARSE_NO_JSON = "no_json"
+PARSE_INVALID_JSON = "invalid_json"
+PARSE_BAD_TAG = "bad_tag"
+PARSE_API_ERROR = "api_error"  # the call itself failed; nothing to parse
+
+# Statuses where the reply could not be turned into a lead decision
+PARSE_FAILURES = (PARSE_NO_JSON, PARSE_INVALID_JSON, PARSE_BAD_TAG)
+
+VALID_LEAD_TAGS = ("Hot", "Warm", "Cold")
+
+_TAG_KEY = '"lead_tag"'
+_TAG_VALUE_RE = re.compile(r'"lead_tag"\s*:\s*"([^"]*)"')
+
+
+class ParseResult:
+    """Outcome of extracting the lead JSON: data, status and where it started."""
+
+    __slots__ = ("data", "status", "error", "start")
+
+    def __init__(self, data, status: str, error: str = "", start: int = -1):
+        self.data = data
+        self.status = status
+        self.error = error
+        self.start = start
+
+    @property
+    def ok(self) -> bool:
+        return self.status not in PARSE_FAILURES
+
+
+def _strip_trailing_commas(candidate: str) -> str:
+    """Drop commas right before } or ], skipping over string literals."""
+    out = []
+    comma = None  # index in `out` of a comma that may turn out to be trailing
+    in_string = escaped = False
+    for ch in candidate:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch in "}]" and comma is not None:
+            out[comma] = ""
+            comma = None
+        elif ch == ",":
+            comma = len(out)
+        elif ch == '"':
+            in_string = True
+            comma = None
+        elif not ch.isspace():
+            comma = None
+        out.append(ch)
+    return "".join(out)
+
+
+def _loads_lenient(candidate: str):
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        # Models often leave a trailing comma before } or ]
+        return json.loads(_strip_trailing_commas(candidate))
+
+
+# =============================
+# INCREMENTAL EXTRACTOR
+# =============================
+class LeadJsonExtractor:
+    """Find the lead JSON object in model output, one chunk at a time.
+
+    Braces are balanced in a single pass (string literals and escapes are
+    tracked, so "}" inside a value doesn't close the object). Each balanced
+    object is parsed as it closes; the first one carrying a lead_tag wins,
+    so braces in the prose summary or a ```json fence around the block don't
+    matter. Feed streamed chunks with feed(), then call result().
+    """
+
+    def __init__(self, required_fields=()):
+        self.required_fields = tuple(required_fields)
+        self.text = ""
+        self._pos = 0
+        self._stack = []  # offsets of open braces
+        self._in_string = False
+        self._escape = False
+        self._found = None  # (start, dict) of the accepted object
+        self._fallback = None  # (start, dict) of the outermost other object
+        self._error = ""
+        self._tag_scan = 0  # where tag_so_far looks for the lead_tag key next
+
+    def feed(self, chunk: str):
+        """Scan a new chunk; returns the lead dict once it is complete, else None."""
+        self.text += chunk
+        if self._found is not None:
+            return self._found[1]
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                # Quotes in prose outside any object are not JSON strings
+                self._in_string = bool(self._stack)
+            elif ch == "{":
+                self._stack.append(i)
+            elif ch == "}" and self._stack:
+                start = self._stack.pop()
+                if self._try_object(start, i + 1):
+                    self._pos = i + 1
+                    return self._found[1]
+        self._pos = len(text)
+        return None
+
+    def _try_object(self, start: int, end: int) -> bool:
+        try:
+            data = _loads_lenient(self.text[start:end])
+        except json.JSONDecodeError as e:
+            self._error = e.msg
+            return False
+        if not isinstance(data, dict):
+            return False
+        if "lead_tag" in data:
+            self._found = (start, data)
+            return True
+        if self._fallback is None or start < self._fallback[0]:
+            self._fallback = (start, data)
+        return False
+
+    @property
+    def object_start(self) -> int:
+        """Offset of the lead object (or of the one still streaming), else -1."""
+        if self._found is not None:
+            return self._found[0]
+        if self._stack:
+            return self._stack[0]
+        return self._fallback[0] if self._fallback is not None else -1
+
+    @property
+    def tag_so_far(self) -> str:
+        """lead_tag as soon as its value is streamed, even before the object closes."""
+        if self._found is not None:
+            return str(self._found[1].get("lead_tag", ""))
+        if not self._stack:
+            return ""
+        # Resume where the last call stopped, so polling per chunk stays linear
+        self._tag_scan = max(self._tag_scan, self._stack[0])
+        key = self.text.find(_TAG_KEY, self._tag_scan)
+        if key == -1:
+            self._tag_scan = max(self._tag_scan, len(self.text) - len(_TAG_KEY) + 1)
+            return ""
+        self._tag_scan = key
+        m = _TAG_VALUE_RE.match(self.text, key)
+        return m.group(1) if m else ""
+
+    def result(self) -> ParseResult:
+        if self._found is None and self._fallback is None:
+            if self._error:
+                return ParseResult(None, PARSE_INVALID_JSON, self._error)
+            return ParseResult(None, PARSE_NO_JSON, "Model did not return JSON.")
+        start, data = self._found or self._fallback
+        tag = str(data.get("lead_tag", "")).strip().capitalize()
+        if tag not in VALID_LEAD_TAGS:
+            return ParseResult(
+                data, PARSE_BAD_TAG, f"lead_tag {data.get('lead_tag')!r} is not Hot/Warm/Cold.", start
+            )
+        data["lead_tag"] = tag
+        missing = [f for f in self.required_fields if f not in data]
+        if missing:
+            return ParseResult(
+                data, PARSE_MISSING_FIELDS, f"Missing fields: {', '.join(missing)}.", start
+            )
+        return ParseResult(data, PARSE_OK, "", start)
+
+
+def extract_lead_json(text: str, required_fields=()) -> ParseResult:
+    """One-shot version of LeadJsonExtractor for a complete reply."""
+    extractor = LeadJsonExtractor(required_fields)
+    extractor.feed(text)
+    return extractor.result()
@@ -0,0 +1,203 @@
+"""Compact run records: __slots__ objects in place of per-run dicts.
+
+A LeadRun / SafetyRun holds the same keys as the run-log dicts built by
+build_lead_run / build_safety_run (and returned by the run store) without a
+hash table per row. Tags are coded as a small IntEnum and low-cardinality
+strings (scenario, status, test names) are interned, so thousands of runs
+kept in session state share them. Records are read-only Mappings: r["key"],
+r.get() and dict(r) work as on the dicts, and to_dict() / to_dicts() give
+the exact dict shape back for st.dataframe, the store and exports.
+"""
+
+import sys
+from collections.abc import Mapping
+from enum import IntEnum
+
+from core.data import REQUIRED_FIELDS
+
+
+# =============================
+# TAGS
+# =============================
+class Tag(IntEnum):
+    """Lead tag, coded by heat; NONE is an unlabeled / unparsed run ("")."""
+
+    NONE = 0
+    COLD = 1
+    WARM = 2
+    HOT = 3
+
+    @property
+    def label(self) -> str:
+        return _TAG_LABELS[self]
+
+
+_TAG_LABELS = ("", "Cold", "Warm", "Hot")
+_TAGS_BY_LABEL = {label: Tag(i) for i, label in enumerate(_TAG_LABELS)}
+
+
+def encode_tag(value):
+    """Tag for "", Hot, Warm or Cold; anything else is kept as an interned str."""
+    tag = _TAGS_BY_LABEL.get(value) if isinstance(value, str) else None
+    if tag is not None:
+        return tag
+    return sys.intern(value) if type(value) is str else value
+
+
+def decode_tag(value):
+    return value.label if isinstance(value, Tag) else value
+
+
+# =============================
+# RECORD BASE
+# =============================
+class _Record(Mapping):
+    """Slots for the known keys; any other key lands in `_extra`.
+
+    The row's key order is kept as a tuple shared by every record with the
+    same keys, so a record converts back to exactly the dict it came from
+    (same keys, same values, same order) for one pointer per record.
+    """
+
+    __slots__ = ("_extra", "_keys")
+    FIELDS = ()
+    TAG_FIELDS = frozenset()
+    INTERNED = frozenset()
+    NESTED = {}  # key -> record class for nested dicts
+    _KEY_ORDERS = {}  # key tuple -> the shared instance of it
+
+    @classmethod
+    def from_dict(cls, row: dict):
+        record = cls.__new__(cls)
+        keys = tuple(row)
+        record._keys = _Record._KEY_ORDERS.setdefault(keys, keys)
+        extra = None
+        for key, value in row.items():
+            if key not in cls._SLOTS:
+                extra = extra or {}
+                extra[key] = value
+                continue
+            if key in cls.TAG_FIELDS:
+                value = encode_tag(value)
+            elif key in cls.INTERNED and type(value) is str:
+                value = sys.intern(value)
+            elif key in cls.NESTED and isinstance(value, dict):
+                value = cls.NESTED[key].from_dict(value)
+            setattr(record, key, value)
+        record._extra = extra
+        return record
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SLOTS = frozenset(cls.FIELDS)
+
+    def _decode(self, key: str, value):
+        if key in self.TAG_FIELDS:
+            return decode_tag(value)
+        if isinstance(value, _Record):
+            return value.to_dict()
+        return value
+
+    def __getitem__(self, key):
+        if key in self._SLOTS:
+            try:
+                return self._decode(key, getattr(self, key))
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self}
+
+
+# =============================
+# RECORDS
+# =============================
+class LeadRecord(_Record):
+    """The lead JSON a model returned (a lead run's raw_json)."""
+
+    FIELDS = (*REQUIRED_FIELDS, "contact_email", "lead_tag", "tag_reasoning")
+    __slots__ = FIELDS
+    TAG_FIELDS = frozenset({"lead_tag"})
+
+
+class LeadRun(_Record):
+    """One lead run, as build_lead_run or RunStore.lead_runs returns it."""
+
+    FIELDS = (
+        "id",
+        "timestamp",
+        "scenario",
+        "expected",
+        "predicted",
+        "tag_correct",
+        "fields_required",
+        "fields_collected",
+        "completeness_pct",
+        "false_hot",
+        "notes",
+        "parse_status",
+        "prompt_tokens",
+        "cached_tokens",
+        "completion_tokens",
+        "cost_usd",
+        "latency_ms",
+        "fallback",
+        "retries",
+        "votes",
+        "vote_agreement",
+        "raw_json",
+    )
+    __slots__ = FIELDS
+    TAG_FIELDS = frozenset({"expected", "predicted"})
+    INTERNED = frozenset({"scenario", "parse_status"})
+    NESTED = {"raw_json": LeadRecord}
+
+
+class SafetyRun(_Record):
+    """One safety-test result, as build_safety_run or RunStore.safety_runs returns it."""
+
+    FIELDS = (
+        "id",
+        "test",
+        "category",
+        "prompt",
+        "pass",
+        "latency_ms",
+        "response_preview",
+        "refusal_phrases",
+        "prompt_tokens",
+        "cached_tokens",
+        "completion_tokens",
+        "fallback",
+        "retries",
+    )
+    __slots__ = FIELDS
+    INTERNED = frozenset({"test", "category", "prompt", "refusal_phrases"})
+
+
+# =============================
+# CONVERSION
+# =============================
+def lead_records(rows):
+    return [LeadRun.from_dict(r) for r in rows]
+
+
+def safety_records(rows):
+    return [SafetyRun.from_dict(r) for r in rows]
+
+
+def to_dicts(records):
+    """Run-log dicts for st.dataframe, the run store and exports."""
+    return [r.to_dict() if isinstance(r, _Record) else r for r in records]
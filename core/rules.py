@@ -0,0 +1,316 @@
+import re
+
+# =============================
+# SETTINGS & LEXICONS
+# =============================
+# Leads at or above this confidence skip the model call
+RULE_CONFIDENCE_THRESHOLD = 0.85
+
+HOT_BUDGET_K = 15.0  # SYSTEM_PROMPT: budget 15–50k or 50k+
+TINY_BUDGET_K = 5.0  # below this we treat the budget as "no budget"
+URGENT_WEEKS = 6.0  # now / this month / next 4–6 weeks
+
+_NUM = r"(\d+(?:[.,]\d+)?)"
+_DASH = r"\s*(?:–|—|-|to)\s*"
+
+BUDGET_RANGE_RE = re.compile(
+    r"\$?" + _NUM + r"\s*(k|000)?" + _DASH + r"\$?" + _NUM + r"\s*(k|000)\b", re.I
+)
+BUDGET_AMOUNT_RE = re.compile(r"\$?" + _NUM + r"\s*(k|000)\b(\+)?", re.I)
+MONEY_RE = re.compile(r"[$€£]\s?(\d{1,3}(?:,\d{3})+|\d+)\s*(k\b)?(\+)?", re.I)
+BUDGET_CONTEXT_RE = re.compile(r"budget|spend|invest|\$|€|£", re.I)
+NO_BUDGET_RE = re.compile(
+    r"\bno budget\b|\bfor free\b|\bfree of charge\b|\bbudget (?:is )?(?:not set|tbd|zero)\b",
+    re.I,
+)
+
+TIMELINE_PATTERNS = [
+    (re.compile(r"\b(?:asap|right away|immediately|urgent(?:ly)?)\b", re.I), 0.0, "ASAP"),
+    (re.compile(r"\b(?:now|this week|today)\b", re.I), 1.0, "Now / this week"),
+    (re.compile(r"\b(?:this month|end of (?:the |this )?month|next month)\b", re.I), 4.0, "This month"),
+    (re.compile(r"\b(?:next|this) quarter\b", re.I), 13.0, "Next quarter"),
+    (re.compile(r"\b(?:next year|someday|some day|eventually)\b", re.I), 52.0, "Next year / someday"),
+]
+WEEKS_RE = re.compile(r"\b" + _NUM + r"(?:" + _DASH + _NUM + r")?\s*weeks?\b", re.I)
+MONTHS_RE = re.compile(r"\b" + _NUM + r"(?:" + _DASH + _NUM + r")?\s*months?\b", re.I)
+NO_TIMELINE_RE = re.compile(r"\bno (?:timeline|rush|deadline)\b", re.I)
+VAGUE_TIMELINE_RE = re.compile(r"\b(?:soon|shortly)\b", re.I)
+# "not now", "not urgent", "don't need it this week": a denied timeline
+NEGATION_BEFORE_RE = re.compile(
+    r"\b(?:not|no|never|isn['’]t|aren['’]t|don['’]t)\s+(?:\w+\s+){0,2}$", re.I
+)
+
+AUTHORITY_YES_RE = re.compile(
+    r"\b(?:co-?founder|founder|ceo|cto|coo|owner|managing director|"
+    r"decision[- ]maker|vp|vice president|i sign|i decide|operations director)\b"
+    # "the owner's assistant" is not the owner
+    r"(?!['’]s\b)",
+    re.I,
+)
+AUTHORITY_NO_RE = re.compile(
+    r"\b(?:not sure if my boss|my boss|ceo signs|need(?:s)? approval|"
+    r"i can influence|not the decision|sales rep|intern|student)\b",
+    re.I,
+)
+ROLE_PATTERNS = [
+    ("Co-founder", re.compile(r"\bco-?founder\b", re.I)),
+    ("Founder", re.compile(r"\bfounder\b", re.I)),
+    ("CEO", re.compile(r"\bceo\b(?!\s+signs)", re.I)),
+    ("VP Sales", re.compile(r"\bvp(?: of)? sales\b", re.I)),
+    ("Head of Sales", re.compile(r"\bhead of sales\b", re.I)),
+    ("Operations Director", re.compile(r"\boperations director\b", re.I)),
+    ("Sales Rep", re.compile(r"\bsales rep\b", re.I)),
+    ("Student", re.compile(r"\bstudent\b|\buniversity project\b", re.I)),
+]
+
+SIZE_RE = re.compile(
+    r"\b(\d+)\s*(\+)?\s*(?:-?\s*)(?:person|people|employees?|ppl|staff|fte)\b", re.I
+)
+SIZE_WORDS = [
+    ("1–10", re.compile(r"\b(?:tiny|solo|freelancer?)\b", re.I)),
+    ("11–50", re.compile(r"\bsmall\b|\bstartup\b", re.I)),
+    ("51–200", re.compile(r"\bmid-?size\b", re.I)),
+    ("200+", re.compile(r"\benterprise\b", re.I)),
+]
+
+INDUSTRY_PATTERNS = [
+    ("SaaS", re.compile(r"\bsaas\b", re.I)),
+    ("Marketing Agency", re.compile(r"\bmarketing agency\b|\bagency\b", re.I)),
+    ("Logistics", re.compile(r"\blogistics\b", re.I)),
+    ("Real Estate", re.compile(r"\bproperty\b|\breal estate\b", re.I)),
+    ("HR Tech", re.compile(r"\bhr tech\b", re.I)),
+    ("Fintech", re.compile(r"\bfintech\b", re.I)),
+    ("Consulting", re.compile(r"\bconsultancy\b|\bconsulting\b", re.I)),
+    ("Education", re.compile(r"\buniversity\b|\bschool\b", re.I)),
+]
+
+WRONG_FIT_RE = re.compile(
+    r"\bfor free\b|\bstudent\b|\buniversity project\b|\bjust curious\b|"
+    r"\bno problem right now\b|\bjust exploring\b|\bexploring tools\b",
+    re.I,
+)
+PROBLEM_RE = re.compile(
+    r"\b(?:drowning|losing|miss(?:ing)?|messy|chaos|slow|pain|problem|struggl\w*|"
+    r"don.t know who|need(?:s)?|want(?:s)? to)\b",
+    re.I,
+)
+
+
+# =============================
+# EXTRACTORS
+# =============================
+def _to_k(value: str, unit: str) -> float:
+    n = float(value.replace(",", ""))
+    if unit:  # "30k" or "30 000"
+        return n
+    # Plain numbers like 30000 without a "k"
+    return n / 1000 if n >= 1000 else n
+
+
+def extract_budget(text: str):
+    """Return (budget_k_low, budget_k_high, status) with status yes/none/unknown."""
+    if NO_BUDGET_RE.search(text):
+        return 0.0, 0.0, "none"
+    if not BUDGET_CONTEXT_RE.search(text):
+        return None, None, "unknown"
+
+    m = BUDGET_RANGE_RE.search(text)
+    if m:
+        unit = m.group(4)
+        low = _to_k(m.group(1), m.group(2) or unit)
+        high = _to_k(m.group(3), unit)
+        return low, high, "yes"
+
+    m = BUDGET_AMOUNT_RE.search(text)
+    if m:
+        amount = _to_k(m.group(1), m.group(2))
+        return amount, None if m.group(3) else amount, "yes"
+
+    m = MONEY_RE.search(text)  # "$30,000" or "€8000"
+    if m:
+        amount = _to_k(m.group(1), m.group(2))
+        return amount, None if m.group(3) else amount, "yes"
+
+    # e.g. "budget unknown" or a budget mention without an amount
+    return None, None, "unknown"
+
+
+def _affirmed(pattern: re.Pattern, text: str):
+    """First match of pattern that isn't negated just before it, else None."""
+    for m in pattern.finditer(text):
+        if not NEGATION_BEFORE_RE.search(text, 0, m.start()):
+            return m
+    return None
+
+
+def extract_timeline(text: str):
+    """Return (weeks, label); weeks is None when no timeline is stated."""
+    if NO_TIMELINE_RE.search(text):
+        return 52.0, "No timeline"
+    found = []
+    for pattern, weeks, label in TIMELINE_PATTERNS:
+        if _affirmed(pattern, text):
+            found.append((weeks, label))
+    m = _affirmed(WEEKS_RE, text)
+    if m:
+        low = float(m.group(1).replace(",", "."))
+        found.append((low, m.group(0)))
+    m = _affirmed(MONTHS_RE, text)
+    if m:
+        low = float(m.group(1).replace(",", ".")) * 4.3
+        found.append((low, m.group(0)))
+    if found:
+        return min(found)
+    if VAGUE_TIMELINE_RE.search(text):
+        return None, "Soon (unspecified)"
+    return None, ""
+
+
+def extract_authority(text: str) -> str:
+    if AUTHORITY_NO_RE.search(text):
+        return "no"
+    if AUTHORITY_YES_RE.search(text):
+        return "yes"
+    return ""
+
+
+def extract_role(text: str) -> str:
+    for role, pattern in ROLE_PATTERNS:
+        if pattern.search(text):
+            return role
+    return ""
+
+
+def extract_company_size(text: str) -> str:
+    m = SIZE_RE.search(text)
+    if m:
+        n = int(m.group(1))
+        if m.group(2) and n >= 200:
+            return "200+"
+        if n <= 10:
+            return "1–10"
+        if n <= 50:
+            return "11–50"
+        if n <= 200:
+            return "51–200"
+        return "200+"
+    for bucket, pattern in SIZE_WORDS:
+        if pattern.search(text):
+            return bucket
+    return ""
+
+
+def extract_industry(text: str) -> str:
+    for industry, pattern in INDUSTRY_PATTERNS:
+        if pattern.search(text):
+            return industry
+    return ""
+
+
+def _budget_range_label(low, high, status: str) -> str:
+    if status == "none":
+        return "No budget"
+    if low is None:
+        return ""
+    if high is None:
+        return "50k+" if low >= 50 else f"{low:g}k+"
+    if low >= 50:
+        return "50k+"
+    if low >= HOT_BUDGET_K:
+        return "15–50k"
+    if high < TINY_BUDGET_K:
+        return "<5k"
+    return "5–15k"
+
+
+def _problem_sentence(text: str) -> str:
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        if PROBLEM_RE.search(sentence):
+            return sentence.strip()
+    return ""
+
+
+# =============================
+# CLASSIFIER
+# =============================
+class RuleResult:
+    """Outcome of the local classifier: tag, confidence (0–1) and lead JSON."""
+
+    __slots__ = ("tag", "confidence", "reasoning", "lead")
+
+    def __init__(self, tag: str, confidence: float, reasoning: str, lead: dict):
+        self.tag = tag
+        self.confidence = confidence
+        self.reasoning = reasoning
+        self.lead = lead
+
+    @property
+    def is_confident(self) -> bool:
+        return self.confidence >= RULE_CONFIDENCE_THRESHOLD
+
+
+def classify_lead(text: str) -> RuleResult:
+    """Apply the SYSTEM_PROMPT Hot/Warm/Cold rules with regex/lexicon parsers."""
+    low, high, budget_status = extract_budget(text)
+    weeks, timeline_label = extract_timeline(text)
+    authority = extract_authority(text)
+    problem = _problem_sentence(text)
+    wrong_fit = WRONG_FIT_RE.search(text)
+
+    strong_budget = budget_status == "yes" and low is not None and low >= HOT_BUDGET_K
+    tiny_budget = budget_status == "none" or (
+        budget_status == "yes" and (high if high is not None else low) < TINY_BUDGET_K
+    )
+    urgent = weeks is not None and weeks <= URGENT_WEEKS
+    no_urgency = weeks is not None and weeks >= 52
+
+    if wrong_fit:
+        tag, confidence = "Cold", 0.95
+        reasoning = "Wrong fit or no real business problem."
+    elif tiny_budget and (no_urgency or weeks is None or authority == "no"):
+        tag, confidence = "Cold", 0.9
+        reasoning = "Explicitly no (or negligible) budget and weak urgency/authority."
+    elif tiny_budget:
+        tag, confidence = "Cold", 0.85
+        reasoning = "Budget far below the 15k threshold."
+    elif strong_budget and urgent and authority == "yes" and problem:
+        tag, confidence = "Hot", 0.9
+        reasoning = "Clear problem, budget ≥ 15k, urgent timeline and decision authority."
+    elif no_urgency and budget_status != "yes":
+        tag, confidence = "Cold", 0.85
+        reasoning = "No urgency and no budget stated."
+    else:
+        missing = [
+            name
+            for name, ok in (
+                ("budget", strong_budget),
+                ("urgency", urgent),
+                ("authority", authority == "yes"),
+            )
+            if not ok
+        ]
+        tag = "Warm" if problem else "Cold"
+        # Warm is where the rules are least sure; let the model decide
+        confidence = 0.6 if len(missing) == 1 else 0.5
+        if problem:
+            reasoning = f"Clear problem but missing {', '.join(missing) or 'detail'}."
+        else:
+            reasoning = "No clear business problem stated."
+
+    lead = {
+        "full_name": "",
+        "company_name": "",
+        "role_title": extract_role(text),
+        "industry": extract_industry(text),
+        "contact_email": "",
+        "primary_goal": problem,
+        "current_problem": problem,
+        "urgency_timeline": timeline_label,
+        "budget_range": _budget_range_label(low, high, budget_status),
+        "decision_authority": authority,
+        "company_size": extract_company_size(text),
+        "lead_tag": tag,
+        "tag_reasoning": reasoning,
+        "notes": f"Local rule classifier (confidence {confidence:.2f}).",
+    }
+    return RuleResult(tag, confidence, reasoning, lead)
@@ -0,0 +1,278 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# =============================
+# SETTINGS
+# =============================
+# Provider limits for the lead model (OpenAI tier 1 for gpt-4o-mini)
+RATE_LIMIT_RPM = 500
+RATE_LIMIT_TPM = 200_000
+
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
+
+# Consecutive failures before calls fail fast, and for how long
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Only these mean the provider is unhealthy; a 429 is it pacing us, and a
+# Retry-After is already honoured by the backoff
+BREAKER_STATUS_MIN = 500
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the breaker is open."""
+
+
+# =============================
+# TOKEN BUCKET
+# =============================
+class TokenBucket:
+    """Refills `per_minute` units a minute, holding at most one minute's worth.
+
+    acquire() reserves units up front and sleeps off any deficit outside
+    the lock, so concurrent callers are spread out evenly rather than all
+    waking at once.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` units, sleeping until they are available; returns the wait."""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def adjust(self, delta: float):
+        """Give back (positive) or charge (negative) units after the fact."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+
+# =============================
+# CIRCUIT BREAKER
+# =============================
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open after a cooldown.
+
+    While half-open a single trial call is let through; it closes the
+    breaker on success and re-opens it on failure. Only 5xx responses and
+    connection errors count as failures (see trips_breaker).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds: float = BREAKER_COOLDOWN_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.cooldown_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half-open" and self._trial_running):
+                raise CircuitOpenError(
+                    "Model API circuit breaker is open after repeated failures; "
+                    "calls are paused briefly."
+                )
+            if state == "half-open":
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+# =============================
+# RETRY POLICY
+# =============================
+def _status_code(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429 / 5xx / timeouts / dropped connections are worth another attempt."""
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    try:
+        from openai import APIConnectionError
+    except ImportError:
+        APIConnectionError = ()
+    return isinstance(exc, (APIConnectionError, ConnectionError, TimeoutError))
+
+
+def trips_breaker(exc: Exception) -> bool:
+    """5xx and dropped connections / timeouts; not 429s or other 4xx."""
+    status = _status_code(exc)
+    if status is not None:
+        return status >= BREAKER_STATUS_MIN
+    return is_retryable(exc)
+
+
+def retry_after_seconds(exc: Exception):
+    """Server-requested delay from retry-after-ms / Retry-After, else None."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int, retry_after=None) -> float:
+    """Full-jitter exponential backoff; a server Retry-After wins if given."""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX_SECONDS) + random.uniform(0, BACKOFF_BASE_SECONDS / 2)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+# =============================
+# SCHEDULER
+# =============================
+class RequestScheduler:
+    """Runs provider calls under RPM/TPM buckets, retries and a circuit breaker.
+
+    Worker threads share one scheduler, so a batch of hundreds of leads is
+    paced to the provider limit instead of tripping 429s.
+    """
+
+    def __init__(
+        self,
+        rpm: float = RATE_LIMIT_RPM,
+        tpm: float = RATE_LIMIT_TPM,
+        max_retries: int = MAX_RETRIES,
+        breaker: CircuitBreaker = None,
+        sleep=time.sleep,
+    ):
+        self.requests = TokenBucket(rpm, sleep=sleep)
+        self.tokens = TokenBucket(tpm, sleep=sleep)
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+
+    def set_limits(self, rpm: float = None, tpm: float = None):
+        """Swap in new RPM / TPM limits (e.g. a higher usage tier)."""
+        if rpm:
+            self.requests = TokenBucket(rpm, sleep=self._sleep)
+        if tpm:
+            self.tokens = TokenBucket(tpm, sleep=self._sleep)
+
+    def _count(self, key: str, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def run(self, fn, estimated_tokens: int = 0):
+        """Call fn() with pacing and retries; returns its result or raises."""
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count("failures")
+                raise
+            waited = self.requests.acquire(1)
+            if estimated_tokens:
+                waited += self.tokens.acquire(estimated_tokens)
+            if waited:
+                self._count("throttled_seconds", waited)
+            try:
+                result = fn()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if trips_breaker(e):
+                    self.breaker.record_failure()
+                else:
+                    # e.g. a 429 or 400: the provider answered, so it is healthy
+                    self.breaker.record_success()
+                if not retryable or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                self._sleep(backoff_seconds(attempt, retry_after_seconds(e)))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def settle_tokens(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the TPM bucket once the real usage is known."""
+        if actual_tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["breaker"] = self.breaker.state
+        return stats
@@ -0,0 +1,375 @@
+import json
+import os
+import sqlite3
+import threading
+
+from core.cache import DATA_DIR
+from core.metrics import ScoreAggregate
+
+# =============================
+# SETTINGS & SCHEMA
+# =============================
+STORE_PATH = os.path.join(DATA_DIR, "runs.sqlite3")
+
+# Column name -> SQLite type. Keys outside these lists are kept in extra_json
+# ("id" is the row's primary key and is never stored as an extra).
+LEAD_COLUMNS = {
+    "timestamp": "TEXT",
+    "scenario": "TEXT",
+    "expected": "TEXT",
+    "predicted": "TEXT",
+    "tag_correct": "INTEGER",
+    "fields_required": "INTEGER",
+    "fields_collected": "INTEGER",
+    "completeness_pct": "REAL",
+    "false_hot": "INTEGER",
+    "notes": "TEXT",
+    "parse_status": "TEXT",
+    "prompt_tokens": "INTEGER",
+    "cached_tokens": "INTEGER",
+    "completion_tokens": "INTEGER",
+    "cost_usd": "REAL",
+    "latency_ms": "REAL",
+    "fallback": "INTEGER",
+    "retries": "INTEGER",
+    "votes": "INTEGER",
+    "vote_agreement": "REAL",
+}
+SAFETY_COLUMNS = {
+    "test": "TEXT",
+    "category": "TEXT",
+    "prompt": "TEXT",
+    "pass": "INTEGER",
+    "latency_ms": "REAL",
+    "response_preview": "TEXT",
+    "prompt_tokens": "INTEGER",
+    "cached_tokens": "INTEGER",
+    "completion_tokens": "INTEGER",
+    "fallback": "INTEGER",
+    "retries": "INTEGER",
+}
+
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
+
+
+def _column_defs(columns: dict) -> str:
+    return ",\n".join(f"    {_quote(c)} {t}" for c, t in columns.items())
+
+
+# =============================
+# RUN STORE
+# =============================
+class RunStore:
+    """SQLite (WAL) store for lead and safety runs, keyed by client + journey.
+
+    One connection is shared by every session in the process; WAL lets other
+    processes read while a batch is being written. A ScoreAggregate per sprint
+    is kept in memory and updated on every write, so scores never need a
+    full scan after the first read.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._aggregates = {}
+        self._version = 0
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS lead_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    client TEXT NOT NULL,
+                    journey TEXT NOT NULL,
+                {_column_defs(LEAD_COLUMNS)},
+                    raw_json TEXT,
+                    extra_json TEXT
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_lead_runs_sprint ON lead_runs (client, journey, id)"
+            )
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS safety_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    client TEXT NOT NULL,
+                    journey TEXT NOT NULL,
+                    suite_id INTEGER NOT NULL,
+                {_column_defs(SAFETY_COLUMNS)},
+                    extra_json TEXT
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_safety_runs_sprint "
+                "ON safety_runs (client, journey, suite_id)"
+            )
+            self._add_missing_columns("lead_runs", LEAD_COLUMNS)
+            self._add_missing_columns("safety_runs", SAFETY_COLUMNS)
+
+    def _add_missing_columns(self, table: str, columns: dict):
+        # Stores created by an older version lack newer columns; old rows read as NULL
+        existing = {r[1] for r in self._conn.execute(f"PRAGMA table_info({table})")}
+        for name, sql_type in columns.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(name)} {sql_type}")
+
+    # ---------- row <-> record ----------
+    @staticmethod
+    def _pack(row: dict, columns: dict, nested: tuple = ()):
+        values = [row.get(c) for c in columns]
+        for key in nested:
+            value = row.get(key)
+            values.append(json.dumps(value, ensure_ascii=False) if value is not None else None)
+        extra = {
+            k: v for k, v in row.items() if k not in columns and k not in nested and k != "id"
+        }
+        values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        return values
+
+    @staticmethod
+    def _unpack(values, columns: dict, nested: tuple = ()):
+        row = {"id": values[0], **dict(zip(columns, values[1:]))}
+        offset = len(columns) + 1
+        for i, key in enumerate(nested):
+            blob = values[offset + i]
+            row[key] = json.loads(blob) if blob else {}
+        extra = values[offset + len(nested)]
+        if extra:
+            row.update(json.loads(extra))
+        return row
+
+    # ---------- lead runs ----------
+    def add_lead_runs(self, client: str, journey: str, rows):
+        """Append lead runs for one sprint in a single transaction."""
+        cols = ["client", "journey", *LEAD_COLUMNS, "raw_json", "extra_json"]
+        sql = (
+            f"INSERT INTO lead_runs ({', '.join(map(_quote, cols))}) "
+            f"VALUES ({', '.join('?' for _ in cols)})"
+        )
+        params = [
+            [client, journey, *self._pack(r, LEAD_COLUMNS, ("raw_json",))] for r in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(sql, params)
+            self._bump_version()
+            agg = self._aggregates.get((client, journey))
+            if agg is not None:
+                for r in rows:
+                    agg.add_lead(r)
+
+    def lead_runs(self, client: str, journey: str):
+        """All lead runs for a sprint, oldest first, in the run-log dict shape."""
+        cols = ", ".join(map(_quote, ["id", *LEAD_COLUMNS, "raw_json", "extra_json"]))
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT {cols} FROM lead_runs WHERE client = ? AND journey = ? ORDER BY id",
+                (client, journey),
+            ).fetchall()
+        return [self._unpack(r, LEAD_COLUMNS, ("raw_json",)) for r in records]
+
+    def lead_runs_page(self, client: str, journey: str, limit: int, offset: int = 0):
+        """One page of a sprint's lead runs, oldest first (rows offset..offset+limit)."""
+        cols = ", ".join(map(_quote, ["id", *LEAD_COLUMNS, "raw_json", "extra_json"]))
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT {cols} FROM lead_runs WHERE client = ? AND journey = ? "
+                "ORDER BY id LIMIT ? OFFSET ?",
+                (client, journey, limit, offset),
+            ).fetchall()
+        return [self._unpack(r, LEAD_COLUMNS, ("raw_json",)) for r in records]
+
+    def iter_lead_runs(
+        self, client: str, journey: str, batch_size: int = 500, after_id: int = 0
+    ):
+        """Yield a sprint's lead runs oldest first, reading batch_size rows at a time.
+
+        `after_id` skips runs up to and including that id (e.g. ones a
+        subscriber has already seen).
+        """
+        cols = ", ".join(map(_quote, ["id", *LEAD_COLUMNS, "raw_json", "extra_json"]))
+        last_id = after_id
+        while True:
+            with self._lock:
+                records = self._conn.execute(
+                    f"SELECT {cols} FROM lead_runs "
+                    "WHERE client = ? AND journey = ? AND id > ? ORDER BY id LIMIT ?",
+                    (client, journey, last_id, batch_size),
+                ).fetchall()
+            if not records:
+                return
+            for r in records:
+                yield self._unpack(r, LEAD_COLUMNS, ("raw_json",))
+            last_id = records[-1][0]
+
+    def delete_lead_run(self, client: str, journey: str, run_id: int):
+        cols = ", ".join(map(_quote, ["id", *LEAD_COLUMNS, "raw_json", "extra_json"]))
+        with self._lock, self._conn:
+            record = self._conn.execute(
+                f"SELECT {cols} FROM lead_runs WHERE id = ? AND client = ? AND journey = ?",
+                (run_id, client, journey),
+            ).fetchone()
+            if record is None:
+                return
+            self._conn.execute("DELETE FROM lead_runs WHERE id = ?", (run_id,))
+            self._bump_version()
+            agg = self._aggregates.get((client, journey))
+            if agg is not None:
+                agg.remove_lead(self._unpack(record, LEAD_COLUMNS, ("raw_json",)))
+
+    def count_lead_runs(self, client: str, journey: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM lead_runs WHERE client = ? AND journey = ?",
+                (client, journey),
+            ).fetchone()[0]
+
+    # ---------- safety runs ----------
+    def set_safety_runs(self, client: str, journey: str, rows):
+        """Record a full safety-suite run; it becomes the sprint's latest result."""
+        cols = ["client", "journey", "suite_id", *SAFETY_COLUMNS, "extra_json"]
+        sql = (
+            f"INSERT INTO safety_runs ({', '.join(map(_quote, cols))}) "
+            f"VALUES ({', '.join('?' for _ in cols)})"
+        )
+        with self._lock, self._conn:
+            suite_id = self._conn.execute(
+                "SELECT COALESCE(MAX(suite_id), 0) + 1 FROM safety_runs "
+                "WHERE client = ? AND journey = ?",
+                (client, journey),
+            ).fetchone()[0]
+            self._conn.executemany(
+                sql,
+                [[client, journey, suite_id, *self._pack(r, SAFETY_COLUMNS)] for r in rows],
+            )
+            self._bump_version()
+            agg = self._aggregates.get((client, journey))
+            if agg is not None:
+                agg.reset_safety()
+                for r in rows:
+                    agg.add_safety(r)
+
+    def latest_suite_id(self, client: str, journey: str) -> int:
+        """suite_id of the sprint's latest safety run (0 if none yet)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(suite_id), 0) FROM safety_runs "
+                "WHERE client = ? AND journey = ?",
+                (client, journey),
+            ).fetchone()[0]
+
+    def last_lead_run_id(self, client: str, journey: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM lead_runs WHERE client = ? AND journey = ?",
+                (client, journey),
+            ).fetchone()[0]
+
+    def safety_runs(self, client: str, journey: str):
+        """Rows of the latest safety-suite run for a sprint."""
+        cols = ", ".join(map(_quote, ["id", *SAFETY_COLUMNS, "extra_json"]))
+        with self._lock:
+            records = self._conn.execute(
+                f"""
+                SELECT {cols} FROM safety_runs
+                WHERE client = ? AND journey = ? AND suite_id = (
+                    SELECT MAX(suite_id) FROM safety_runs WHERE client = ? AND journey = ?
+                )
+                ORDER BY id
+                """,
+                (client, journey, client, journey),
+            ).fetchall()
+        return [self._unpack(r, SAFETY_COLUMNS) for r in records]
+
+    # ---------- versions & aggregates ----------
+    def _bump_version(self):
+        # Caller holds self._lock
+        self._version += 1
+        self._changed.notify_all()
+
+    def _sync_external_writes(self):
+        # data_version moves only when another connection commits
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._aggregates.clear()
+            self._data_version = data_version
+            self._bump_version()
+
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever any run is written (here or elsewhere)."""
+        with self._lock:
+            self._sync_external_writes()
+            return self._version
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the version moves past `version` or `timeout` passes.
+
+        Writes through this store wake waiters at once; writes by other
+        processes are noticed when the wait times out. Returns the version.
+        """
+        with self._changed:
+            self._sync_external_writes()
+            if self._version == version:
+                self._changed.wait(timeout)
+                self._sync_external_writes()
+            return self._version
+
+    def aggregate(self, client: str, journey: str) -> ScoreAggregate:
+        """Snapshot of the sprint's running totals (built from disk on first use)."""
+        with self._lock:
+            self._sync_external_writes()
+            agg = self._aggregates.get((client, journey))
+            if agg is None:
+                agg = self._build_aggregate(client, journey)
+                self._aggregates[(client, journey)] = agg
+            return agg.snapshot()
+
+    def _build_aggregate(self, client: str, journey: str) -> ScoreAggregate:
+        agg = ScoreAggregate()
+        records = self._conn.execute(
+            "SELECT scenario, expected, predicted, tag_correct, completeness_pct, false_hot, "
+            "parse_status, prompt_tokens, cached_tokens, completion_tokens, cost_usd, "
+            "latency_ms, fallback, retries "
+            "FROM lead_runs WHERE client = ? AND journey = ? ORDER BY id",
+            (client, journey),
+        )
+        names = (
+            "scenario", "expected", "predicted", "tag_correct", "completeness_pct",
+            "false_hot", "parse_status", "prompt_tokens", "cached_tokens",
+            "completion_tokens", "cost_usd", "latency_ms", "fallback", "retries",
+        )
+        for values in records:
+            agg.add_lead(dict(zip(names, values)))
+        records = self._conn.execute(
+            """
+            SELECT pass FROM safety_runs
+            WHERE client = ? AND journey = ? AND suite_id = (
+                SELECT MAX(suite_id) FROM safety_runs WHERE client = ? AND journey = ?
+            )
+            """,
+            (client, journey, client, journey),
+        )
+        for (passed,) in records:
+            agg.add_safety({"pass": passed})
+        return agg
+
+    # ---------- housekeeping ----------
+    def is_empty(self) -> bool:
+        with self._lock:
+            lead = self._conn.execute("SELECT 1 FROM lead_runs LIMIT 1").fetchone()
+            safety = self._conn.execute("SELECT 1 FROM safety_runs LIMIT 1").fetchone()
+        return lead is None and safety is None
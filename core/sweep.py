@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.data import (
+    BATCH_MAX_WORKERS,
+    LEAD_TEMPERATURE,
+    MODEL_PRICING,
+    SAFETY_TESTS,
+    SCENARIOS,
+    compute_scores,
+    estimate_cost,
+    gate_label,
+    run_safety_suite,
+    run_scenarios_batch,
+)
+from core.metrics import percentile
+from core.records import lead_records, safety_records, to_dicts
+
+# =============================
+# SETTINGS
+# =============================
+SWEEP_MODELS = tuple(MODEL_PRICING)
+SWEEP_TEMPERATURES = (0.0, LEAD_TEMPERATURE)
+
+# Arms running at once; each arm also runs its leads on its own pool
+SWEEP_MAX_ARMS = 4
+
+
+class SweepArm:
+    """One (model, temperature) configuration and its sprint results.
+
+    Runs are kept as LeadRun / SafetyRun records: arms live in session state.
+    """
+
+    def __init__(self, model: str, temperature: float):
+        self.model = model
+        self.temperature = temperature
+        self.lead_runs = []
+        self.safety_runs = []
+
+    def to_result(self) -> dict:
+        """JSON-ready arm and runs, e.g. for a background job's result."""
+        return {
+            "model": self.model,
+            "temperature": self.temperature,
+            "lead_runs": to_dicts(self.lead_runs),
+            "safety_runs": to_dicts(self.safety_runs),
+        }
+
+    @classmethod
+    def from_result(cls, result: dict) -> "SweepArm":
+        arm = cls(result["model"], result["temperature"])
+        arm.lead_runs = lead_records(result["lead_runs"])
+        arm.safety_runs = safety_records(result["safety_runs"])
+        return arm
+
+    @property
+    def label(self) -> str:
+        return f"{self.model} @ {self.temperature:g}"
+
+    def summary(self) -> dict:
+        """Scores, gate, latency and cost of this arm as one table row.
+
+        Runs served from the response cache count with the cost and latency
+        of the call that first made their reply (call_cost_usd /
+        call_latency_ms), so an arm that hit the cache doesn't look free.
+        """
+        acc, comp, safety, rel, run_count, _safety_count, false_hot = compute_scores(
+            self.lead_runs, self.safety_runs
+        )
+        runs = self.lead_runs + self.safety_runs
+        latencies = sorted(
+            r.get("call_latency_ms", r.get("latency_ms"))
+            for r in runs
+            if r.get("latency_ms") is not None
+        )
+        lead_cost = sum(r.get("call_cost_usd", r.get("cost_usd") or 0.0) for r in self.lead_runs)
+        safety_cost = sum(
+            r["call_cost_usd"]
+            if "call_cost_usd" in r
+            else estimate_cost(
+                r.get("prompt_tokens") or 0,
+                r.get("cached_tokens") or 0,
+                r.get("completion_tokens") or 0,
+                self.model,
+            )
+            for r in self.safety_runs
+        )
+        return {
+            "arm": self.label,
+            "model": self.model,
+            "temperature": self.temperature,
+            "gate": gate_label(rel, safety, false_hot),
+            "reliability": round(rel, 1),
+            "accuracy": round(acc, 1),
+            "completeness": round(comp, 1),
+            "safety": round(safety, 1),
+            "false_hot_rate": round(false_hot, 1),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "cost_usd": round(lead_cost + safety_cost, 6),
+            "cost_per_lead_usd": round(lead_cost / run_count, 6) if run_count else 0.0,
+            "fallbacks": sum(r.get("fallback") or 0 for r in runs),
+            "cache_hits": sum(r.get("cache_hits") or 0 for r in runs),
+        }
+
+
+def sweep_arms(models=SWEEP_MODELS, temperatures=SWEEP_TEMPERATURES):
+    """Every model × temperature combination, in input order."""
+    return [SweepArm(m, t) for m in models for t in temperatures]
+
+
+def run_sweep(
+    arms,
+    scenarios=SCENARIOS,
+    safety_tests=SAFETY_TESTS,
+    use_fake: bool = False,
+    max_arms: int = SWEEP_MAX_ARMS,
+    max_workers: int = BATCH_MAX_WORKERS,
+    on_arm_done=None,
+    **llm_options,
+):
+    """Run the same scenarios and safety tests on every arm, arms in parallel.
+
+    All arms share the response cache (its key includes model and
+    temperature, so arms never see each other's replies), the request
+    scheduler and the HTTP pool. A cached reply is scored with the cost and
+    latency of its original call (SweepArm.summary), so a rerun reports the
+    same cost and about the same latency as the first sweep. `llm_options`
+    go to call_llm_meta as in run_scenarios_batch; the arm's temperature
+    applies to lead calls only, safety tests keep SAFETY_TEMPERATURE as in
+    the sprint.
+    `on_arm_done(done, total, arm)` fires on the calling thread; if it
+    raises, arms not yet started are skipped. Returns the
+    arms, in input order, with their runs filled in.
+    """
+    arms = list(arms)
+    use_cache = llm_options.get("use_cache", True)
+
+    def _run_arm(arm):
+        arm.lead_runs = lead_records(
+            run_scenarios_batch(
+                scenarios,
+                use_fake=use_fake,
+                max_workers=max_workers,
+                model=arm.model,
+                temperature=arm.temperature,
+                **llm_options,
+            )
+        )
+        arm.safety_runs = safety_records(
+            run_safety_suite(
+                safety_tests,
+                use_fake=use_fake,
+                max_workers=max_workers,
+                use_cache=use_cache,
+                model=arm.model,
+            )
+        )
+        return arm
+
+    if not arms:
+        return arms
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_arms), len(arms)))) as pool:
+        futures = [pool.submit(_run_arm, arm) for arm in arms]
+        try:
+            for done, fut in enumerate(as_completed(futures), start=1):
+                arm = fut.result()
+                if on_arm_done:
+                    on_arm_done(done, len(arms), arm)
+        except BaseException:
+            # e.g. a cancel raised from on_arm_done: don't start queued arms
+            for fut in futures:
+                fut.cancel()
+            raise
+    return arms
+
+
+def pick_winner(summaries):
+    """Cheapest arm that reaches GO, ties broken by p50 latency; else None."""
+    go = [s for s in summaries if s["gate"] == "GO"]
+    if not go:
+        return None
+    return min(
+        go,
+        key=lambda s: (
+            s["cost_per_lead_usd"],
+            s["p50_ms"] if s["p50_ms"] is not None else float("inf"),
+        ),
+    )
+
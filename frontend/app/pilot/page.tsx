@@ -5,6 +5,7 @@ import { motion } from "framer-motion";
 import { StatusBadge } from "../../components/StatusBadge";
 import { useSprint } from "../../components/SprintContext";
 import type { LeadTag } from "../../components/SprintContext";
+import { QUALIFY_API_URL, qualifyLead } from "../../lib/qualifyApi";
 
 interface Scenario {
   id: number;
@@ -191,9 +192,32 @@ export default function PilotPage() {
     setResultJson(null);
   };
 
-  const handleRunPilot = () => {
+  const [apiError, setApiError] = useState<string | null>(null);
+  const [running, setRunning] = useState(false);
+
+  const handleRunPilot = async () => {
     if (!message.trim()) return;
 
+    if (QUALIFY_API_URL) {
+      // Real qualification via the shared Python engine
+      setRunning(true);
+      setApiError(null);
+      try {
+        const { run } = await qualifyLead(
+          message,
+          selectedScenario.expectedTag,
+          selectedScenario.label
+        );
+        // The logged run reaches the log through the sprint event stream
+        setResultJson(run.raw_json);
+      } catch (err) {
+        setApiError(err instanceof Error ? err.message : String(err));
+      } finally {
+        setRunning(false);
+      }
+      return;
+    }
+
     const predictedTag = classifyLead(message);
     const structured = buildStructuredLead(message, predictedTag);
     const { fieldsCollected, fieldsRequired, completenessPct } =
@@ -321,10 +345,16 @@ In a real sprint, this conversation would feed into the same Hot / Warm / Cold l
 
           <button
             onClick={handleRunPilot}
-            className="mt-3 inline-flex items-center justify-center rounded-full bg-gradient-to-r from-emerald-400 to-sky-400 px-4 py-1.5 text-sm font-semibold text-slate-950 hover:brightness-105"
+            disabled={running}
+            className="mt-3 inline-flex items-center justify-center rounded-full bg-gradient-to-r from-emerald-400 to-sky-400 px-4 py-1.5 text-sm font-semibold text-slate-950 hover:brightness-105 disabled:opacity-60"
           >
-            Run pilot &amp; log result
+            {running ? "Qualifying…" : "Run pilot & log result"}
           </button>
+          {apiError && (
+            <p className="text-xs text-rose-300">
+              Qualification API error: {apiError}
+            </p>
+          )}
         </div>
 
         {/* Right: JSON result */}
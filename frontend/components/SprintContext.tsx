@@ -3,11 +3,32 @@
 import React, {
   createContext,
   useContext,
+  useEffect,
   useState,
   ReactNode,
 } from "react";
+import { QUALIFY_API_URL } from "../lib/qualifyApi";
 
 export type LeadTag = "Hot" | "Warm" | "Cold";
+export type Decision = "GO" | "FIX" | "NO-GO";
+
+// Same gate as core/data.py gate_label (GO_THRESHOLD, FIX_THRESHOLD,
+// SAFETY_TARGET, FALSE_HOT_TARGET); only used when there is no API
+const GO_THRESHOLD = 80;
+const FIX_THRESHOLD = 65;
+const SAFETY_TARGET = 100;
+const FALSE_HOT_TARGET = 10;
+
+function gateLabel(reliability: number, safety: number, falseHotRate: number): Decision {
+  if (
+    reliability >= GO_THRESHOLD &&
+    safety >= SAFETY_TARGET &&
+    falseHotRate <= FALSE_HOT_TARGET
+  ) {
+    return "GO";
+  }
+  return reliability >= FIX_THRESHOLD ? "FIX" : "NO-GO";
+}
 
 export interface PilotRun {
   id: number;
@@ -22,11 +43,25 @@ export interface PilotRun {
   rawJson: any; // structured lead JSON for drilldown
 }
 
+// Sprint scores as published by the Python API's event stream
+export interface ServerScores {
+  has_lead_runs: boolean;
+  accuracy: number;
+  completeness: number;
+  safety: number;
+  reliability: number;
+  false_hot_rate: number;
+  lead_runs: number;
+  safety_runs: number;
+  gate: Decision | null;
+}
+
 interface SprintState {
   pilotRuns: PilotRun[];
   safetyTestsRun: boolean;
   safetyPassed: number;
   safetyTotal: number;
+  serverScores: ServerScores | null;
 }
 
 interface SprintContextValue {
@@ -45,8 +80,51 @@ export function SprintProvider({ children }: { children: ReactNode }) {
     safetyTestsRun: false,
     safetyPassed: 0,
     safetyTotal: 0,
+    serverScores: null,
   });
 
+  // Live sync with the Python run store (api/server.py /v1/events)
+  useEffect(() => {
+    if (!QUALIFY_API_URL) return;
+    const source = new EventSource(`${QUALIFY_API_URL}/v1/events?after_id=0`);
+
+    source.addEventListener("lead_run", (e) => {
+      const run = JSON.parse((e as MessageEvent).data);
+      const pilotRun: PilotRun = {
+        id: run.id,
+        scenarioLabel: run.scenario,
+        expectedTag: run.expected,
+        predictedTag: run.predicted,
+        correct: run.tag_correct === 1,
+        timestamp: run.timestamp,
+        fieldsCollected: run.fields_collected,
+        fieldsRequired: run.fields_required,
+        completenessPct: run.completeness_pct,
+        rawJson: run.raw_json,
+      };
+      setState((prev) =>
+        prev.pilotRuns.some((r) => r.id === pilotRun.id)
+          ? prev
+          : { ...prev, pilotRuns: [pilotRun, ...prev.pilotRuns] }
+      );
+    });
+    source.addEventListener("safety", (e) => {
+      const { passed, total } = JSON.parse((e as MessageEvent).data);
+      setState((prev) => ({
+        ...prev,
+        safetyTestsRun: true,
+        safetyPassed: passed,
+        safetyTotal: total,
+      }));
+    });
+    source.addEventListener("scores", (e) => {
+      const scores: ServerScores = JSON.parse((e as MessageEvent).data);
+      setState((prev) => ({ ...prev, serverScores: scores }));
+    });
+
+    return () => source.close();
+  }, []);
+
   const addPilotRun = (run: PilotRun) => {
     setState((prev) => ({
       ...prev,
@@ -80,10 +158,31 @@ export function useSprint() {
 
 /**
  * Derived metrics + decision + sprint-complete flag.
+ *
+ * With the API configured, scores and the gate come from the server's
+ * `scores` events, so the dashboard shows the decision the server computes;
+ * the local calculation is only a fallback without an API.
  */
 export function useSprintMetrics() {
   const { state } = useSprint();
-  const { pilotRuns, safetyTestsRun, safetyPassed, safetyTotal } = state;
+  const { pilotRuns, safetyTestsRun, safetyPassed, safetyTotal, serverScores } = state;
+
+  if (serverScores) {
+    // Without lead runs the server reports demo placeholders and no gate
+    const hasRuns = serverScores.has_lead_runs;
+    return {
+      accuracy: hasRuns ? serverScores.accuracy : 0,
+      completeness: hasRuns ? serverScores.completeness : 0,
+      safety: hasRuns ? serverScores.safety : 0,
+      reliability: hasRuns ? serverScores.reliability : 0,
+      decision: serverScores.gate ?? ("NO-GO" as Decision),
+      falseHotRate: hasRuns ? serverScores.false_hot_rate : 0,
+      pilotRunsCount: serverScores.lead_runs,
+      safetyPassed,
+      safetyTotal,
+      isSprintComplete: serverScores.lead_runs >= 3 && serverScores.safety_runs > 0,
+    };
+  }
 
   const pilotRunsCount = pilotRuns.length;
   const correctCount = pilotRuns.filter((r) => r.correct).length;
@@ -115,14 +214,8 @@ export function useSprintMetrics() {
   const falseHotRate =
     pilotRunsCount > 0 ? (falseHotCount / pilotRunsCount) * 100 : 0;
 
-  let decision: "GO" | "FIX" | "NO-GO" = "NO-GO";
-  if (reliability >= 80 && safety === 100 && pilotRunsCount >= 3) {
-    decision = "GO";
-  } else if (reliability >= 60) {
-    decision = "FIX";
-  } else {
-    decision = "NO-GO";
-  }
+  const decision: Decision =
+    pilotRunsCount > 0 ? gateLabel(reliability, safety, falseHotRate) : "NO-GO";
 
   const isSprintComplete = pilotRunsCount >= 3 && safetyTestsRun;
 
@@ -0,0 +1,40 @@
+import type { LeadTag } from "../components/SprintContext";
+
+// Base URL of the Python qualification API (api/server.py), e.g.
+// http://localhost:8000. When unset the pages fall back to their local mocks.
+export const QUALIFY_API_URL = process.env.NEXT_PUBLIC_QUALIFY_API_URL ?? "";
+
+export interface QualifiedRun {
+  scenario: string;
+  expected: string;
+  predicted: LeadTag | "";
+  tag_correct: number;
+  fields_collected: number;
+  fields_required: number;
+  completeness_pct: number;
+  latency_ms: number | null;
+  raw_json: Record<string, unknown>;
+}
+
+export interface QualifyResponse {
+  lead: Record<string, unknown>;
+  meta: Record<string, unknown>;
+  run: QualifiedRun;
+}
+
+export async function qualifyLead(
+  message: string,
+  expected: LeadTag | "",
+  scenario: string
+): Promise<QualifyResponse> {
+  const res = await fetch(`${QUALIFY_API_URL}/v1/qualify`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ message, expected, scenario }),
+  });
+  if (!res.ok) {
+    const body = await res.json().catch(() => ({}));
+    throw new Error(body.detail ?? `Qualification API returned ${res.status}`);
+  }
+  return res.json();
+}
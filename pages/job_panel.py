@@ -0,0 +1,76 @@
+import streamlit as st
+
+from core.jobs import ACTIVE, CANCELLED, DONE, get_job_queue
+
+# =============================
+# SETTINGS
+# =============================
+JOB_REFRESH_SECONDS = 1.0
+
+
+def track_job(state_key: str, job_id: int):
+    """Remember the job a panel follows; it survives reruns in session_state."""
+    st.session_state[state_key] = job_id
+    st.session_state.pop(f"{state_key}_finished", None)
+
+
+def adopt_active_job(state_key: str, client: str, journey: str, kind: str):
+    """Follow a job of this sprint that is still running (e.g. after a page reload)."""
+    if st.session_state.get(state_key) is None:
+        job = get_job_queue().active_job(client, journey, kind)
+        if job is not None:
+            track_job(state_key, job["id"])
+
+
+@st.fragment(run_every=JOB_REFRESH_SECONDS)
+def render_job_progress(state_key: str, render_partial=None):
+    """Live progress + cancel for the tracked job; reruns the page when it ends.
+
+    Only this fragment refreshes while the job runs, so the rest of the
+    page stays interactive. `render_partial(partial)` draws the job's
+    results so far under the progress bar.
+    """
+    job_id = st.session_state.get(state_key)
+    if job_id is None:
+        return
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        st.session_state.pop(state_key, None)
+        return
+
+    if job["status"] in ACTIVE:
+        done, total = job["done"], job["total"]
+        label = "Queued" if job["status"] == "queued" else f"{done}/{total} done"
+        if job["cancel_requested"]:
+            label += " – cancelling after the current calls"
+        elif job["message"]:
+            label += f" – {job['message']}"
+        st.progress(done / total if total else 0.0, text=label)
+        if st.button("Cancel", key=f"{state_key}_cancel", disabled=bool(job["cancel_requested"])):
+            queue.cancel(job_id)
+        if render_partial is not None and job["partial"] is not None:
+            render_partial(job["partial"])
+        return
+
+    # Finished: hand the result to the page and refresh scores, logs etc.
+    st.session_state.pop(state_key, None)
+    st.session_state[f"{state_key}_finished"] = job
+    st.rerun()
+
+
+def finished_job(state_key: str):
+    """The tracked job once it has ended (DONE / FAILED / CANCELLED), else None.
+
+    Returned on the first rerun after it ends only, like a button result.
+    """
+    return st.session_state.pop(f"{state_key}_finished", None)
+
+
+def render_job_outcome(job: dict, done_message: str):
+    if job["status"] == DONE:
+        st.success(done_message)
+    elif job["status"] == CANCELLED:
+        st.warning(f"Job cancelled after {job['done']}/{job['total']}.")
+    else:
+        st.error(f"Job failed: {job['error']}")
@@ -1,15 +1,35 @@
+import os
+
 import streamlit as st
-from datetime import datetime
 
 from core.data import (
     SCENARIOS,
-    call_llm,
+    BATCH_MAX_WORKERS,
+    call_llm_meta,
+    feed_stream,
+    llm_options,
+    streamed_summary,
+    streamed_tag,
     validate_lead_message,
-    score_tag,
-    completeness,
-    REQUIRED_FIELDS,
+    build_lead_run,
+    count_lead_runs,
+    log_lead_runs,
+    sprint_key,
+)
+from core.ingest import IMPORT_CHUNK_SIZE
+from core.parsing import LeadJsonExtractor
+from core.jobs import JOB_IMPORT, JOB_LEADS, get_job_queue, submit_import_job, submit_lead_job
+from pages.job_panel import (
+    adopt_active_job,
+    finished_job,
+    render_job_outcome,
+    render_job_progress,
+    track_job,
 )
 
+BATCH_JOB_KEY = "batch_job"
+IMPORT_JOB_KEY = "import_job"
+
 
 MULTI_TURN_QUESTIONS = [
     "Who are you and what is your role?",
@@ -26,6 +46,8 @@ def init_state():
         st.session_state.last_pilot_json = None
     if "last_pilot_tag" not in st.session_state:
         st.session_state.last_pilot_tag = ""
+    if "last_pilot_summary" not in st.session_state:
+        st.session_state.last_pilot_summary = ""
     if "mock_step" not in st.session_state:
         st.session_state.mock_step = 0
     if "mock_history" not in st.session_state:
@@ -38,6 +60,157 @@ def init_state():
         st.session_state.lead_message = ""
 
 
+def render_live_decision(slot, extractor, done: bool = False):
+    """Show the streamed summary and (once emitted) the tag while tokens arrive."""
+    tag = streamed_tag(extractor) or "…"
+    summary = streamed_summary(extractor) or (
+        "No prose summary (structured JSON output)." if done else "Waiting for the model…"
+    )
+    status = "Final" if done else "Streaming"
+    slot.markdown(
+        f"""
+        <div class="card">
+          <div class="section-title">{status} AI decision: <b>{tag}</b></div>
+          <div class="section-body" style="margin-top:4px;">{summary}</div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+def qualify_lead(message: str, use_fake: bool, stream: bool, live_slot):
+    """Run one lead through the model, streaming into live_slot if asked.
+
+    Returns (lead_json, meta) as call_llm_meta does.
+    """
+    options = llm_options()
+    if not stream:
+        st.session_state.last_pilot_summary = ""
+        return call_llm_meta(message, use_fake=use_fake, **options)
+
+    # One extractor for the whole stream, fed only the new text each update
+    extractor = LeadJsonExtractor()
+
+    def _on_text(text):
+        render_live_decision(live_slot, feed_stream(extractor, text))
+
+    js, meta = call_llm_meta(message, use_fake=use_fake, on_text=_on_text, **options)
+    render_live_decision(live_slot, extractor, done=True)
+    st.session_state.last_pilot_summary = streamed_summary(extractor)
+    return js, meta
+
+
+def _import_file_id(job: dict):
+    """Uploader id (name:size) of the file an import job reads, if still on disk."""
+    params = job["params"]
+    try:
+        return f"{params['filename']}:{os.path.getsize(params['path'])}"
+    except OSError:
+        return None
+
+
+def _adopt_import_job():
+    """Follow a running import of this sprint, e.g. after a page reload.
+
+    The uploader is empty after a reload, so the job's file id is recovered
+    from its params; the resume cursor then lands on that file when it ends.
+    """
+    adopt_active_job(IMPORT_JOB_KEY, *sprint_key(), JOB_IMPORT)
+    job_id = st.session_state.get(IMPORT_JOB_KEY)
+    if job_id is None or st.session_state.get("import_job_file") is not None:
+        return
+    job = get_job_queue().get(job_id)
+    if job is not None:
+        st.session_state.import_job_file = _import_file_id(job)
+
+
+def _apply_import_job(imports: dict, job: dict):
+    """Move the imported file's resume cursor past what a finished job logged."""
+    file_id = st.session_state.pop("import_job_file", None)
+    stats = job["result"] or job["partial"]
+    if file_id is None or not stats:
+        return
+    progress_state = imports.setdefault(file_id, {"row": 0, "logged": 0, "invalid": []})
+    progress_state["row"] = stats["row"]
+    progress_state["logged"] += stats["logged"]
+    progress_state["invalid"] = progress_state["invalid"] + [tuple(i) for i in stats["invalid"]]
+
+
+def render_bulk_import(use_fake: bool):
+    """Upload a CSV/JSONL export of leads and import it as a background job."""
+    with st.expander("Bulk import — replay a lead export (CSV / JSONL)"):
+        st.markdown(
+            '<div class="section-body">'
+            "One lead per row: a <b>message</b> column plus an optional <b>expected</b> tag "
+            "(Hot/Warm/Cold) and <b>scenario</b> name. Rows are validated, qualified in "
+            "parallel and written to the sprint log in chunks, so an interrupted import "
+            "resumes where it stopped."
+            "</div>",
+            unsafe_allow_html=True,
+        )
+        _adopt_import_job()
+        imports = st.session_state.setdefault("lead_imports", {})
+        job = finished_job(IMPORT_JOB_KEY)
+        if job is not None:
+            _apply_import_job(imports, job)
+            stats = job["result"] or {}
+            render_job_outcome(
+                job,
+                f"Import finished: {stats.get('logged', 0)} leads logged in "
+                f"{stats.get('elapsed', 0.0):.1f}s ({stats.get('leads_per_sec', 0.0):.1f} leads/sec) ✅",
+            )
+
+        upload = st.file_uploader("Lead file", type=["csv", "jsonl", "json", "ndjson"])
+        if upload is None:
+            # An adopted import keeps running (and stays cancellable) without the file
+            if st.session_state.get(IMPORT_JOB_KEY) is not None:
+                render_job_progress(IMPORT_JOB_KEY)
+            return
+
+        file_id = f"{upload.name}:{upload.size}"
+        progress_state = imports.setdefault(file_id, {"row": 0, "logged": 0, "invalid": []})
+
+        chunk_size = st.number_input(
+            "Rows per chunk", min_value=1, max_value=500, value=IMPORT_CHUNK_SIZE
+        )
+        if progress_state["row"]:
+            st.caption(
+                f"{progress_state['logged']} leads already logged from this file; "
+                f"the import resumes after row {progress_state['row']}."
+            )
+
+        running = st.session_state.get(IMPORT_JOB_KEY) is not None
+        col_start, col_reset = st.columns(2)
+        with col_reset:
+            if st.button("Restart from first row", disabled=running):
+                imports[file_id] = progress_state = {"row": 0, "logged": 0, "invalid": []}
+        with col_start:
+            start = st.button("Start / resume import", disabled=running)
+
+        if start:
+            job_id = submit_import_job(
+                get_job_queue(),
+                *sprint_key(),
+                upload,
+                upload.name,
+                start_row=progress_state["row"],
+                chunk_size=int(chunk_size),
+                use_fake=use_fake,
+                **llm_options(),
+            )
+            st.session_state.import_job_file = file_id
+            track_job(IMPORT_JOB_KEY, job_id)
+        if st.session_state.get(IMPORT_JOB_KEY) is not None:
+            render_job_progress(IMPORT_JOB_KEY)
+
+        if progress_state["invalid"]:
+            st.markdown(f"**Skipped rows ({len(progress_state['invalid'])})**")
+            st.dataframe(
+                [{"row": r, "reason": why} for r, why in progress_state["invalid"][:200]],
+                use_container_width=True,
+            )
+
+
 def render_lead_pilot(use_fake: bool):
     init_state()
 
@@ -59,7 +232,7 @@ def render_lead_pilot(use_fake: bool):
     # Stepper status
     has_message = bool(st.session_state.lead_message.strip())
     has_decision = st.session_state.last_pilot_json is not None
-    has_logged = len(st.session_state.lead_runs) > 0
+    has_logged = count_lead_runs() > 0
 
     step1_class = "done" if has_message else ""
     step2_class = "done" if has_decision else ""
@@ -89,6 +262,10 @@ def render_lead_pilot(use_fake: bool):
 
     col_left, col_right = st.columns([1.6, 1.4])
 
+    with col_right:
+        st.markdown("#### 2) AI decision & summary")
+        live_slot = st.empty()
+
     with col_left:
         st.markdown("#### 1) Lead message (choose or paste)")
 
@@ -132,13 +309,21 @@ def render_lead_pilot(use_fake: bool):
         )
         expected_tag = [s[2] for s in SCENARIOS if s[0] == picked][0]
 
+        stream_mode = st.toggle(
+            "Stream AI output as it is generated",
+            value=True,
+            help="Shows the summary and Hot/Warm/Cold tag while the model is still writing.",
+        )
+
         col_btn1, col_btn2 = st.columns(2)
         with col_btn1:
             if st.button("Simulate AI decision (one-shot)"):
                 if not valid:
                     st.error("Lead message is too weak – improve it before testing.")
                 else:
-                    js = call_llm(st.session_state.lead_message, use_fake=use_fake)
+                    js, _meta = qualify_lead(
+                        st.session_state.lead_message, use_fake, stream_mode, live_slot
+                    )
                     st.session_state.last_pilot_json = js
                     st.session_state.last_pilot_tag = js.get("lead_tag", "")
                     st.success("AI decision simulated ✅")
@@ -148,36 +333,63 @@ def render_lead_pilot(use_fake: bool):
                 if not valid:
                     st.error("Lead message is too weak – improve it before logging.")
                 else:
-                    js = call_llm(st.session_state.lead_message, use_fake=use_fake)
-                    predicted_tag = js.get("lead_tag", "")
-                    tag_correct = score_tag(expected_tag, predicted_tag)
-                    fields_collected, comp_pct = completeness(js)
+                    js, meta = qualify_lead(
+                        st.session_state.lead_message, use_fake, stream_mode, live_slot
+                    )
+                    run = build_lead_run(picked, expected_tag, js, meta)
 
                     st.session_state.last_pilot_json = js
-                    st.session_state.last_pilot_tag = predicted_tag
-
-                    st.session_state.lead_runs.append(
-                        {
-                            "timestamp": datetime.now().isoformat(timespec="seconds"),
-                            "scenario": picked,
-                            "expected": expected_tag,
-                            "predicted": predicted_tag,
-                            "tag_correct": tag_correct,
-                            "fields_required": len(REQUIRED_FIELDS),
-                            "fields_collected": fields_collected,
-                            "completeness_pct": round(comp_pct, 1),
-                            "false_hot": 1
-                            if predicted_tag == "Hot" and expected_tag != "Hot"
-                            else 0,
-                            "notes": js.get("tag_reasoning", ""),
-                            "raw_json": js,
-                        }
-                    )
+                    st.session_state.last_pilot_tag = run["predicted"]
+
+                    log_lead_runs([run])
                     st.success("Pilot run added to sprint log ✅")
 
-    with col_right:
-        st.markdown("#### 2) AI decision & summary")
+        with st.expander("Batch mode — run all scenarios"):
+            st.markdown(
+                '<div class="section-body">'
+                f"Runs all {len(SCENARIOS)} demo scenarios in parallel and logs a scored run for each."
+                "</div>",
+                unsafe_allow_html=True,
+            )
+            workers = st.slider(
+                "Concurrent model calls",
+                min_value=1,
+                max_value=16,
+                value=BATCH_MAX_WORKERS,
+            )
+            adopt_active_job(BATCH_JOB_KEY, *sprint_key(), JOB_LEADS)
+            if st.button(
+                "Run all scenarios (batch)",
+                disabled=st.session_state.get(BATCH_JOB_KEY) is not None,
+            ):
+                job_id = submit_lead_job(
+                    get_job_queue(),
+                    *sprint_key(),
+                    SCENARIOS,
+                    use_fake=use_fake,
+                    max_workers=workers,
+                    **llm_options(),
+                )
+                track_job(BATCH_JOB_KEY, job_id)
+            if st.session_state.get(BATCH_JOB_KEY) is not None:
+                render_job_progress(BATCH_JOB_KEY)
+
+            job = finished_job(BATCH_JOB_KEY)
+            if job is not None:
+                result = job["result"] or {}
+                if result.get("last_json"):
+                    st.session_state.last_pilot_json = result["last_json"]
+                    st.session_state.last_pilot_tag = result["last_tag"]
+                elapsed = (job["finished_at"] or 0) - (job["started_at"] or job["created_at"])
+                render_job_outcome(
+                    job,
+                    f"Logged {result.get('runs', 0)} runs in {elapsed:.1f}s "
+                    f"({result.get('tag_correct', 0)}/{result.get('runs', 0)} tags correct) ✅",
+                )
+
+        render_bulk_import(use_fake)
 
+    with col_right:
         js = st.session_state.last_pilot_json
         if js is None:
             st.info("Run a simulation or a logged pilot to see AI output here.")
@@ -206,6 +418,9 @@ def render_lead_pilot(use_fake: bool):
                 """,
                 unsafe_allow_html=True,
             )
+            if st.session_state.last_pilot_summary:
+                st.markdown("**Model summary**")
+                st.markdown(st.session_state.last_pilot_summary)
             st.markdown("**Raw JSON output**")
             st.json(js)
 
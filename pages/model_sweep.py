@@ -0,0 +1,139 @@
+import streamlit as st
+
+from core.data import (
+    BATCH_MAX_WORKERS,
+    LEAD_MODEL,
+    SAFETY_TESTS,
+    SCENARIOS,
+    llm_options,
+    log_lead_runs,
+    log_safety_runs,
+    sprint_key,
+)
+from core.jobs import DONE, JOB_SWEEP, get_job_queue, submit_sweep_job
+from core.records import to_dicts
+from core.sweep import (
+    SWEEP_MAX_ARMS,
+    SWEEP_MODELS,
+    SWEEP_TEMPERATURES,
+    SweepArm,
+    pick_winner,
+    sweep_arms,
+)
+from pages.job_panel import (
+    adopt_active_job,
+    finished_job,
+    render_job_outcome,
+    render_job_progress,
+    track_job,
+)
+
+SWEEP_JOB_KEY = "sweep_job"
+
+
+def render_winner(summaries):
+    """Card naming the cheapest, fastest arm that reaches GO."""
+    winner = pick_winner(summaries)
+    if winner is None:
+        best = max(summaries, key=lambda s: s["reliability"])
+        st.warning(
+            f"No configuration reaches GO. Best reliability: {best['arm']} "
+            f"({best['reliability']:.0f}/100, {best['gate']})."
+        )
+        return None
+    st.markdown(
+        f"""
+        <div class="card" style="margin-top:10px;">
+          <div class="section-title">Recommended configuration</div>
+          <div class="section-body" style="margin-top:4px;">
+            <b>{winner['arm']}</b> is the cheapest configuration that still reaches <b>GO</b>:
+            reliability {winner['reliability']:.0f}/100, ≈ ${winner['cost_per_lead_usd']:.5f} per lead,
+            p50 latency {winner['p50_ms'] or 0:,.0f} ms.
+          </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+    return winner
+
+
+def render_model_sweep(use_fake: bool):
+    st.markdown("### Model Sweep — pick the model for this journey")
+
+    st.markdown(
+        f"""
+        <div class="card">
+          <div class="section-body" style="margin-top:4px;">
+            Runs the same {len(SCENARIOS)} test scenarios and {len(SAFETY_TESTS)} safety prompts
+            against several model / temperature settings in parallel and compares reliability,
+            gate, latency and cost. The sprint currently uses <b>{LEAD_MODEL}</b>.
+          </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+    if use_fake:
+        st.caption("Fake mode: every configuration returns the same demo output.")
+
+    col_models, col_temps = st.columns(2)
+    with col_models:
+        models = st.multiselect("Models", list(SWEEP_MODELS), default=list(SWEEP_MODELS))
+    with col_temps:
+        temperatures = st.multiselect(
+            "Temperatures",
+            [0.0, 0.2, 0.5, 0.8, 1.0],
+            default=list(SWEEP_TEMPERATURES),
+        )
+    col_arms, col_workers = st.columns(2)
+    with col_arms:
+        max_arms = st.slider("Configurations at once", 1, 8, SWEEP_MAX_ARMS)
+    with col_workers:
+        workers = st.slider("Concurrent calls per configuration", 1, 32, BATCH_MAX_WORKERS)
+
+    arms = sweep_arms(models, sorted(temperatures))
+    adopt_active_job(SWEEP_JOB_KEY, *sprint_key(), JOB_SWEEP)
+    if st.button(
+        f"Run sweep ({len(arms)} configurations)",
+        disabled=not arms or st.session_state.get(SWEEP_JOB_KEY) is not None,
+    ):
+        job_id = submit_sweep_job(
+            get_job_queue(),
+            *sprint_key(),
+            models,
+            sorted(temperatures),
+            use_fake=use_fake,
+            max_arms=max_arms,
+            max_workers=workers,
+            **llm_options(),
+        )
+        track_job(SWEEP_JOB_KEY, job_id)
+    if st.session_state.get(SWEEP_JOB_KEY) is not None:
+        render_job_progress(SWEEP_JOB_KEY)
+
+    job = finished_job(SWEEP_JOB_KEY)
+    if job is not None:
+        if job["status"] == DONE:
+            st.session_state.sweep_arms = [SweepArm.from_result(r) for r in job["result"]["arms"]]
+        render_job_outcome(
+            job, f"Sweep finished in {(job['finished_at'] or 0) - (job['started_at'] or 0):.1f}s ✅"
+        )
+
+    done_arms = st.session_state.get("sweep_arms")
+    if not done_arms:
+        st.info("No sweep run yet. Pick models and temperatures, then run the sweep.")
+        return
+
+    summaries = [arm.summary() for arm in done_arms]
+    winner = render_winner(summaries)
+    st.markdown("#### Comparison")
+    st.dataframe(
+        sorted(summaries, key=lambda s: (s["gate"] != "GO", s["cost_per_lead_usd"])),
+        use_container_width=True,
+    )
+
+    if winner is not None:
+        arm = next(a for a in done_arms if a.label == winner["arm"])
+        if st.button(f"Log {arm.label} runs to the sprint"):
+            log_lead_runs(to_dicts(arm.lead_runs))
+            log_safety_runs(to_dicts(arm.safety_runs))
+            st.success(f"Logged {len(arm.lead_runs)} lead runs and the safety results ✅")
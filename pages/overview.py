@@ -1,8 +1,8 @@
 import streamlit as st
 
 from core.data import (
-    compute_scores,
-    gate_label,
+    get_metrics,
+    safety_telemetry,
     GO_THRESHOLD,
     ACCURACY_TARGET,
     COMPLETENESS_TARGET,
@@ -28,7 +28,57 @@ def metric_status(value: float, target: float, inverse: bool = False):
         return "Too low", "bad"
 
 
+def _ms(value) -> str:
+    return "–" if value is None else f"{value:,.0f} ms"
+
+
+def render_telemetry(metrics):
+    """Card with call latency, tokens and fallback numbers for Tier-2 sizing."""
+    t = metrics.telemetry
+    if not t.get("timed_runs"):
+        return
+    safety = safety_telemetry()
+    safety_line = (
+        f"Safety suite: p50 {_ms(safety['p50_ms'])}, p95 {_ms(safety['p95_ms'])}, "
+        f"{safety['fallback_rate']:.0f}% failed calls."
+        if safety["runs"]
+        else "Safety suite not run yet."
+    )
+    html = f"""
+    <div class="card" style="margin-top:14px;">
+      <div class="section-title">Runtime telemetry</div>
+      <div class="metrics-row">
+        <div class="metric-card">
+          <div class="metric-label">Latency p50</div>
+          <div class="metric-value">{_ms(t['p50_ms'])}</div>
+          <div class="metric-caption">Typical lead.</div>
+        </div>
+        <div class="metric-card">
+          <div class="metric-label">Latency p95 / p99</div>
+          <div class="metric-value">{_ms(t['p95_ms'])}</div>
+          <div class="metric-caption">p99: {_ms(t['p99_ms'])}</div>
+        </div>
+        <div class="metric-card">
+          <div class="metric-label">Tokens / lead</div>
+          <div class="metric-value">{t['tokens_per_lead']:,.0f}</div>
+          <div class="metric-caption">Prompt + completion.</div>
+        </div>
+        <div class="metric-card">
+          <div class="metric-label">Fallback rate</div>
+          <div class="metric-value">{t['fallback_rate']:.1f}%</div>
+          <div class="metric-caption">{t['retries_per_lead']:.2f} retries / lead.</div>
+        </div>
+      </div>
+      <div class="section-body" style="margin-top:6px;">
+        Based on {t['timed_runs']} timed lead runs. {safety_line}
+      </div>
+    </div>
+    """
+    st.markdown(html, unsafe_allow_html=True)
+
+
 def render_overview(use_fake: bool):
+    metrics = get_metrics()
     (
         acc,
         comp,
@@ -37,9 +87,9 @@ def render_overview(use_fake: bool):
         run_count,
         safety_count,
         false_hot_rate,
-    ) = compute_scores(st.session_state.lead_runs, st.session_state.safety_runs)
+    ) = metrics.scores()
 
-    label = gate_label(rel, safety_score, false_hot_rate)
+    label = metrics.gate
 
     client_name = st.session_state.get("client_name", "Demo client")
     journey_name = st.session_state.get("journey_name", "ONE inbound lead journey")
@@ -201,17 +251,9 @@ def render_overview(use_fake: bool):
             """
             st.markdown(info_html, unsafe_allow_html=True)
 
-    # "What this sprint tells you" + how-to-use
-    (
-        acc,
-        comp,
-        safety_score,
-        rel,
-        run_count,
-        safety_count,
-        false_hot_rate,
-    ) = compute_scores(st.session_state.lead_runs, st.session_state.safety_runs)
+    render_telemetry(metrics)
 
+    # "What this sprint tells you" + how-to-use
     bullets = []
     bullets.append(
         f"This journey tags leads correctly about <b>{acc:.0f}%</b> of the time, "
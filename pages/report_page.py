@@ -1,8 +1,7 @@
 import streamlit as st
 
 from core.data import (
-    compute_scores,
-    gate_label,
+    get_metrics,
     GO_THRESHOLD,
     ACCURACY_TARGET,
     COMPLETENESS_TARGET,
@@ -14,13 +13,9 @@ from core.data import (
 def render_report_page():
     st.markdown("### 1-page Tier-1 Pilot Report (text template)")
 
-    runs = st.session_state.get("lead_runs", [])
-    safety_runs = st.session_state.get("safety_runs", [])
-
-    acc, comp, safety_score, rel, run_count, safety_count, false_hot = compute_scores(
-        runs, safety_runs
-    )
-    label = gate_label(rel, safety_score, false_hot)
+    metrics = get_metrics()
+    acc, comp, safety_score, rel, run_count, safety_count, false_hot = metrics.scores()
+    label = metrics.gate
 
     client_name = st.session_state.get("client_name", "Demo Client")
     client_industry = st.session_state.get("client_industry", "B2B")
@@ -1,6 +1,62 @@
 import streamlit as st
 
-from core.data import SAFETY_TESTS, call_safety_llm, compute_scores
+from core.data import (
+    SAFETY_TESTS,
+    BATCH_MAX_WORKERS,
+    get_metrics,
+    get_safety_runs,
+    sprint_key,
+)
+from core.jobs import JOB_SAFETY, get_job_queue, submit_safety_job
+from pages.job_panel import (
+    adopt_active_job,
+    finished_job,
+    render_job_outcome,
+    render_job_progress,
+    track_job,
+)
+
+SAFETY_JOB_KEY = "safety_job"
+
+
+def render_safety_summary(slot, safety_runs, title: str = "Last safety run"):
+    """Render the overall + per-category pass rollup into a placeholder."""
+    passed = sum(r["pass"] for r in safety_runs)
+    total = len(safety_runs)
+    pct = passed / total * 100 if total else 0
+
+    # Group by category
+    by_cat = {}
+    for r in safety_runs:
+        cat = r.get("category", "Other")
+        by_cat.setdefault(cat, {"total": 0, "passed": 0})
+        by_cat[cat]["total"] += 1
+        by_cat[cat]["passed"] += r["pass"]
+
+    parts = []
+    for cat, stats in by_cat.items():
+        parts.append(
+            f'<div class="context-chip"><b>{cat}:</b> {stats["passed"]}/{stats["total"]} passed</div>'
+        )
+    slot.markdown(
+        f"""
+        <div class="card" style="margin-top:10px;">
+          <div class="section-title">{title}</div>
+          <div class="section-body" style="margin-top:4px;">
+            Overall: <b>{passed}/{total}</b> tests passed (~{pct:.0f}%).<br/><br/>
+            <div style="display:flex;flex-wrap:wrap;gap:6px;margin-top:4px;font-size:11px;">
+              {"".join(parts)}
+            </div>
+          </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+def render_partial_summary(partial_runs):
+    """Rollup of the tests a running suite job has finished so far."""
+    render_safety_summary(st.empty(), partial_runs, "Safety run in progress")
 
 
 def render_safety_suite(use_fake: bool):
@@ -18,70 +74,54 @@ def render_safety_suite(use_fake: bool):
         unsafe_allow_html=True,
     )
 
-    safety_runs = st.session_state.get("safety_runs", [])
+    safety_runs = get_safety_runs()
 
-    # Mini summary at top
+    # Mini summary of the last recorded suite; a running one shows its live
+    # rollup under the progress bar
+    summary_slot = st.empty()
     if safety_runs:
-        passed = sum(r["pass"] for r in safety_runs)
-        total = len(safety_runs)
-        pct = passed / total * 100 if total else 0
-
-        # Group by category
-        by_cat = {}
-        for r in safety_runs:
-            cat = r.get("category", "Other")
-            by_cat.setdefault(cat, {"total": 0, "passed": 0})
-            by_cat[cat]["total"] += 1
-            by_cat[cat]["passed"] += r["pass"]
-
-        st.markdown(
-            f"""
-            <div class="card" style="margin-top:10px;">
-              <div class="section-title">Last safety run</div>
-              <div class="section-body" style="margin-top:4px;">
-                Overall: <b>{passed}/{total}</b> tests passed (~{pct:.0f}%).<br/><br/>
-                <div style="display:flex;flex-wrap:wrap;gap:6px;margin-top:4px;font-size:11px;">
-            """,
-            unsafe_allow_html=True,
-        )
-        parts = []
-        for cat, stats in by_cat.items():
-            parts.append(
-                f'<div class="context-chip"><b>{cat}:</b> {stats["passed"]}/{stats["total"]} passed</div>'
-            )
-        st.markdown("".join(parts) + "</div></div></div>", unsafe_allow_html=True)
+        render_safety_summary(summary_slot, safety_runs)
     else:
-        st.info("No safety tests run yet. Use the button below to run the full suite.")
+        summary_slot.info("No safety tests run yet. Use the button below to run the full suite.")
 
     st.markdown("")
 
-    if st.button("Run red-team safety suite (10 tests)"):
-        results = []
-        for name, category, prompt in SAFETY_TESTS:
-            resp_text, passed = call_safety_llm(prompt, use_fake=use_fake)
-            results.append(
-                {
-                    "test": name,
-                    "category": category,
-                    "prompt": prompt,
-                    "pass": 1 if passed else 0,
-                    "response_preview": resp_text[:140] + ("…" if len(resp_text) > 140 else ""),
-                }
-            )
-        st.session_state.safety_runs = results
-        st.success("Safety tests recorded ✅")
-        safety_runs = results
+    workers = st.slider(
+        "Concurrent safety calls",
+        min_value=1,
+        max_value=32,
+        value=BATCH_MAX_WORKERS,
+    )
+
+    adopt_active_job(SAFETY_JOB_KEY, *sprint_key(), JOB_SAFETY)
+    if st.button(
+        f"Run red-team safety suite ({len(SAFETY_TESTS)} tests)",
+        disabled=st.session_state.get(SAFETY_JOB_KEY) is not None,
+    ):
+        job_id = submit_safety_job(
+            get_job_queue(),
+            *sprint_key(),
+            SAFETY_TESTS,
+            use_fake=use_fake,
+            max_workers=workers,
+            use_cache=st.session_state.get("use_cache", True),
+        )
+        track_job(SAFETY_JOB_KEY, job_id)
+    if st.session_state.get(SAFETY_JOB_KEY) is not None:
+        render_job_progress(SAFETY_JOB_KEY, render_partial=render_partial_summary)
+
+    job = finished_job(SAFETY_JOB_KEY)
+    if job is not None:
+        render_job_outcome(job, "Safety tests recorded ✅")
 
     if safety_runs:
         st.markdown("#### Detailed safety log")
         st.dataframe(safety_runs, use_container_width=True)
 
     # Also show effect on scores
-    runs = st.session_state.get("lead_runs", [])
-    if runs:
-        acc, comp, safety_score, rel, run_count, safety_count, false_hot = compute_scores(
-            runs, safety_runs
-        )
+    metrics = get_metrics()
+    if metrics.has_lead_runs:
+        acc, comp, safety_score, rel, run_count, safety_count, false_hot = metrics.scores()
         st.markdown(
             f"""
             <div class="card" style="margin-top:14px;">
@@ -1,25 +1,31 @@
 import streamlit as st
 
-from core.data import compute_scores, get_log_csv_bytes
+from core.export import parquet_available, spool_export
+
+from core.data import (
+    get_metrics,
+    get_lead_runs_page,
+    lead_runs_factory,
+    delete_lead_run,
+)
+
+# Runs shown per page of the log table; totals come from the running scores
+SPRINT_LOG_PAGE_SIZE = 200
 
 
 def render_sprint_log():
     st.markdown("### Sprint Log & Summary")
 
-    runs = st.session_state.get("lead_runs", [])
-    safety_runs = st.session_state.get("safety_runs", [])
-
-    if not runs:
+    metrics = get_metrics()
+    if not metrics.has_lead_runs:
         st.info("No pilot runs logged yet. Use the Lead Pilot page to add runs.")
         return
 
-    acc, comp, safety_score, rel, run_count, safety_count, false_hot = compute_scores(
-        runs, safety_runs
-    )
+    acc, comp, safety_score, rel, run_count, safety_count, false_hot = metrics.scores()
 
-    hot_count = sum(1 for r in runs if r.get("predicted") == "Hot")
-    warm_count = sum(1 for r in runs if r.get("predicted") == "Warm")
-    cold_count = sum(1 for r in runs if r.get("predicted") == "Cold")
+    hot_count = metrics.tag_counts.get("Hot", 0)
+    warm_count = metrics.tag_counts.get("Warm", 0)
+    cold_count = metrics.tag_counts.get("Cold", 0)
 
     st.markdown(
         f"""
@@ -31,6 +37,7 @@ def render_sprint_log():
               <li>Lead tags: <b>{hot_count} Hot</b>, <b>{warm_count} Warm</b>, <b>{cold_count} Cold</b>.</li>
               <li>Tag accuracy around <b>{acc:.0f}%</b>, completeness around <b>{comp:.0f}%</b>.</li>
               <li>False-HOT risk around <b>{false_hot:.1f}%</b> – how often weak leads are escalated as “Hot”.</li>
+              <li><b>{metrics.parse_failures}</b> model replies could not be parsed ({metrics.parse_failure_rate:.1f}% of runs) – logged with no tag, counted as misses.</li>
             </ul>
           </div>
         </div>
@@ -40,25 +47,47 @@ def render_sprint_log():
 
     st.markdown("")
 
+    total = metrics.logged_runs
+    pages = -(-total // SPRINT_LOG_PAGE_SIZE)
+    page = pages
+    if pages > 1:
+        page = int(st.number_input("Log page (newest last)", 1, pages, value=pages, step=1))
+    offset = (page - 1) * SPRINT_LOG_PAGE_SIZE
+    runs = get_lead_runs_page(SPRINT_LOG_PAGE_SIZE, offset)
+    if not runs:
+        st.info("No pilot runs on this page.")
+        return
+
     col1, col2 = st.columns([1.7, 1.3])
 
     with col1:
         st.markdown("#### Measurement log table")
+        st.caption(f"Runs {offset + 1}–{offset + len(runs)} of {total}")
         st.dataframe(runs, use_container_width=True)
 
-        csv_bytes = get_log_csv_bytes()
-        if csv_bytes:
-            st.download_button(
-                "Download sprint log as CSV",
-                data=csv_bytes,
-                file_name="tier1_sprint_log.csv",
-                mime="text/csv",
-            )
+        formats = {
+            "CSV": ("csv", "text/csv"),
+            "JSONL": ("jsonl", "application/x-ndjson"),
+        }
+        if parquet_available():
+            formats["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+        fmt_label = st.radio("Export format", list(formats), horizontal=True)
+        fmt, mime = formats[fmt_label]
+        rows_factory = lead_runs_factory()
+        st.download_button(
+            f"Download sprint log as {fmt_label}",
+            # Built on click, streamed in chunks into a spooled temp file
+            data=lambda: spool_export(rows_factory, fmt),
+            file_name=f"tier1_sprint_log.{fmt}",
+            mime=mime,
+        )
 
     with col2:
         st.markdown("#### Inspect a single run")
 
-        options = [f"{i+1}. {r['timestamp']} – {r['scenario']}" for i, r in enumerate(runs)]
+        options = [
+            f"{offset + i + 1}. {r['timestamp']} – {r['scenario']}" for i, r in enumerate(runs)
+        ]
         choice = st.selectbox(
             "Select a run",
             options,
@@ -98,3 +127,7 @@ def render_sprint_log():
 
         st.markdown("**Raw JSON for this run**")
         st.json(js)
+
+        if st.button("Remove this run from the sprint log"):
+            delete_lead_run(run["id"])
+            st.rerun()
@@ -0,0 +1,30 @@
+"""Shared fixtures: the fake OpenAI API and per-test cache / run store files."""
+
+import pytest
+
+from benchmarks.fake_openai import FakeConfig, start_server
+from core import data
+from core.cache import ResponseCache
+from core.store import RunStore
+
+
+@pytest.fixture
+def fake_api(monkeypatch, tmp_path):
+    """Base URL of a fake API the real client talks to; nothing leaks past the test.
+
+    The process-wide client, scheduler, response cache and run store are
+    rebuilt for the test, the last two on files under tmp_path.
+    """
+    server, base_url = start_server(FakeConfig(latency_ms=1, latency_sigma=0))
+    monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    cache = ResponseCache(str(tmp_path / "llm_cache.sqlite3"))
+    store = RunStore(str(tmp_path / "runs.sqlite3"))
+    monkeypatch.setattr(data, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(data, "get_run_store", lambda: store)
+    data.get_openai_client.clear()
+    data.get_request_scheduler.clear()
+    yield base_url
+    data.get_openai_client.clear()
+    data.get_request_scheduler.clear()
+    server.shutdown()
@@ -0,0 +1,29 @@
+"""The response cache is best effort: a locked database never fails a call."""
+
+import sqlite3
+
+from core import cache as cache_module
+from core.cache import ResponseCache
+
+
+def test_locked_cache_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_BUSY_TIMEOUT_SECONDS", 0.1)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path)
+    assert cache._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    cache.put("a", "cached")
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        cache.put("b", "lost")
+        # Readers are not blocked in WAL mode; only the LRU touch fails
+        assert cache.get("a") == "cached"
+        assert cache.get("b") is None
+    finally:
+        other.rollback()
+        other.close()
+
+    assert cache.stats()["errors"] == 2
+    cache.put("b", "kept")
+    assert cache.get("b") == "kept"
@@ -0,0 +1,107 @@
+"""Running score totals and the snapshots the run store hands out."""
+
+import math
+import random
+
+import pytest
+
+from core.data import compute_scores, reliability, scores_from_aggregate
+from core.metrics import ScoreAggregate, percentile, telemetry_summary
+
+
+def _run(latency_ms):
+    return {"tag_correct": 1, "completeness_pct": 90.0, "expected": "Hot", "latency_ms": latency_ms}
+
+
+def _random_runs(rng, n, labeled=1.0):
+    runs = []
+    for _ in range(n):
+        expected = rng.choice(("Hot", "Warm", "Cold")) if rng.random() < labeled else ""
+        correct = int(bool(expected) and rng.random() < 0.8)
+        runs.append(
+            {
+                "expected": expected,
+                "predicted": expected if correct else "Hot",
+                "tag_correct": correct,
+                "false_hot": int(bool(expected) and not correct and expected != "Hot"),
+                "completeness_pct": round(rng.uniform(0, 100), 1),
+                "latency_ms": round(rng.lognormvariate(6, 0.6), 1),
+            }
+        )
+    return runs
+
+
+def _original_scores(lead_runs, safety_runs):
+    """compute_scores as it was before running totals: plain sum, all-run rates."""
+    n = len(lead_runs)
+    acc = sum(r["tag_correct"] for r in lead_runs) / n * 100
+    comp = sum(r["completeness_pct"] for r in lead_runs) / n
+    false_hot = sum(r.get("false_hot", 0) for r in lead_runs) / n * 100
+    safety = sum(r["pass"] for r in safety_runs) / len(safety_runs) * 100
+    rel = reliability(acc, comp, safety)
+    return acc, comp, safety, rel, n, len(safety_runs), false_hot
+
+
+def test_aggregate_matches_full_scan_exactly():
+    rng = random.Random(3)
+    runs = _random_runs(rng, 2000, labeled=0.9)
+    safety = [{"pass": i % 7 != 0} for i in range(10)]
+    agg = ScoreAggregate()
+    for r in runs:
+        agg.add_lead(r)
+    for r in safety:
+        agg.add_safety(r)
+    # Removing runs must not leave rounding behind
+    for r in rng.sample(runs, 500):
+        agg.remove_lead(r)
+        runs.remove(r)
+    assert scores_from_aggregate(agg) == compute_scores(runs, safety)
+
+
+def test_differences_from_the_original_formula_are_deliberate():
+    rng = random.Random(5)
+    safety = [{"pass": 1}, {"pass": 0}]
+    for _ in range(200):
+        runs = _random_runs(rng, rng.randint(1, 300))
+        new, old = compute_scores(runs, safety), _original_scores(runs, safety)
+        # Everything labeled: same counts and denominators
+        assert new[0] == old[0] and new[4:] == old[4:]
+        # Completeness is the correctly rounded mean, at most a bit or two off
+        assert new[1] == math.fsum(r["completeness_pct"] for r in runs) / len(runs)
+        assert new[1] == pytest.approx(old[1], rel=1e-12, abs=1e-12)
+
+    # Unlabeled runs no longer count against accuracy or false-HOT
+    runs = _random_runs(rng, 100) + [dict(_run(1.0), expected="", tag_correct=0)] * 100
+    labeled = [r for r in runs if r["expected"]]
+    assert compute_scores(runs, safety)[0] == compute_scores(labeled, safety)[0]
+    assert compute_scores(runs, safety)[0] == pytest.approx(2 * _original_scores(runs, safety)[0])
+
+
+def test_latency_percentiles_within_one_percent():
+    rng = random.Random(11)
+    runs = _random_runs(rng, 5000)
+    agg = ScoreAggregate()
+    for r in runs:
+        agg.add_lead(r)
+    for r in runs[:1000]:
+        agg.remove_lead(r)
+    exact = sorted(r["latency_ms"] for r in runs[1000:])
+    summary = agg.latency_summary()
+    assert summary["timed_runs"] == 4000
+    for p in (50, 95, 99):
+        assert summary[f"p{p}_ms"] == pytest.approx(percentile(exact, p), rel=0.01)
+
+
+def test_snapshot_keeps_latency_percentiles():
+    agg = ScoreAggregate()
+    for latency in range(100, 0, -1):
+        agg.add_lead(_run(float(latency)))
+    snap = agg.snapshot()
+    assert telemetry_summary(snap) == telemetry_summary(agg)
+    assert snap.latency_summary()["p95_ms"] == pytest.approx(95.0, rel=0.01)
+
+    # Later runs change the live totals, not the snapshot
+    agg.add_lead(_run(500.0))
+    assert snap.lead_runs == 100
+    assert snap.latency_summary()["timed_runs"] == 100
+    assert agg.latency_summary()["timed_runs"] == 101
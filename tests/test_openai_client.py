@@ -0,0 +1,21 @@
+"""The real OpenAI client, built from the installed SDK, against the fake API."""
+
+
+def test_client_builds_from_installed_sdk(fake_api):
+    from core.data import HTTP_POOL_SIZE, get_openai_client
+
+    client = get_openai_client()
+    assert client.max_retries == 0
+    assert str(client.base_url).rstrip("/") == fake_api
+    assert HTTP_POOL_SIZE > 0
+
+
+def test_lead_call_does_not_fall_back(fake_api):
+    from core.data import PARSE_OK, call_llm_meta
+
+    js, meta = call_llm_meta(
+        "Founder, budget 20k, need this in 4 weeks.", use_cache=False, show_errors=False
+    )
+    assert meta["fallback"] == 0
+    assert meta["parse_status"] == PARSE_OK
+    assert js["lead_tag"] in ("Hot", "Warm", "Cold")
@@ -0,0 +1,43 @@
+"""Streaming lead extraction: one extractor per stream, fed chunk by chunk."""
+
+from core.data import (
+    REQUIRED_FIELDS,
+    _unparsed_lead,
+    completeness,
+    feed_stream,
+    streamed_summary,
+    streamed_tag,
+)
+from core.parsing import LeadJsonExtractor, extract_lead_json
+
+REPLY = (
+    'Ana from Acme: "urgent" budget {approved}.\n```json\n'
+    '{"full_name": "Ana", "notes": "brace } in text", "lead_tag": "Hot"}\n```'
+)
+
+
+def test_streamed_chunks_match_full_parse():
+    extractor = LeadJsonExtractor()
+    for end in range(1, len(REPLY) + 1):
+        feed_stream(extractor, REPLY[:end])
+        whole = LeadJsonExtractor()
+        whole.feed(REPLY[:end])
+        assert streamed_tag(extractor) == whole.tag_so_far
+        assert streamed_summary(extractor) == streamed_summary(whole)
+    assert streamed_tag(extractor) == "Hot"
+    assert streamed_summary(extractor) == 'Ana from Acme: "urgent" budget {approved}.'
+    assert extractor.result().data["notes"] == "brace } in text"
+
+
+def test_trailing_commas_are_dropped_outside_strings_only():
+    reply = '{"full_name": "Ana", "notes": "budget: 10k, ]  or ,}", "lead_tag": "Warm",\n}'
+    result = extract_lead_json(reply, REQUIRED_FIELDS)
+    assert result.ok
+    assert result.data["notes"] == "budget: 10k, ]  or ,}"
+    assert result.data["lead_tag"] == "Warm"
+
+
+def test_unparsed_lead_earns_no_completeness():
+    js = _unparsed_lead("no JSON object found")
+    assert completeness(js) == (0, 0.0)
+    assert "no JSON object found" in js["tag_reasoning"]
@@ -0,0 +1,69 @@
+"""Local rule classifier: authority and timeline cues, and when it may skip the model."""
+
+import pytest
+
+from core.data import SCENARIOS
+from core.rules import classify_lead, extract_authority, extract_timeline
+
+PAIN = "We are drowning in inbound leads. Budget 30k."
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I'm the sales coordinator here.",
+        "I'm the owner's assistant.",
+        "I'm the owner’s assistant.",
+        "Our founders asked me to look into this.",
+        "The CEO's office asked me to reach out.",
+        "I work with several co-founders.",
+    ],
+)
+def test_authority_words_inside_other_words_do_not_count(text):
+    assert extract_authority(text) == ""
+    lead = classify_lead(f"{text} {PAIN} Need it in 4 weeks.")
+    assert lead.tag != "Hot"
+    assert not lead.is_confident
+
+
+@pytest.mark.parametrize(
+    "text", ["I'm the founder.", "I'm the CEO.", "As owner, I decide.", "I'm a VP at Acme."]
+)
+def test_authority_roles(text):
+    assert extract_authority(text) == "yes"
+
+
+@pytest.mark.parametrize(
+    "text, weeks",
+    [
+        ("Not now, maybe next year.", 52.0),
+        ("Not right now.", None),
+        ("This is not urgent, next quarter is fine.", 13.0),
+        ("We don't need it this week.", None),
+        ("Not in 2 weeks, more like 3 months.", 3 * 4.3),
+    ],
+)
+def test_negated_timelines_are_ignored(text, weeks):
+    assert extract_timeline(text)[0] == weeks
+
+
+def test_denied_timeline_is_not_hot():
+    lead = classify_lead(f"I'm the founder. {PAIN} Not now, maybe next year.")
+    assert lead.tag != "Hot"
+    assert lead.lead["urgency_timeline"] == "Next year / someday"
+
+
+def test_clear_hot_lead_skips_the_model():
+    lead = classify_lead(f"I'm the founder. {PAIN} Need it now.")
+    assert (lead.tag, lead.is_confident) == ("Hot", True)
+
+
+def test_reasoning_matches_a_cold_tag_without_a_problem():
+    lead = classify_lead("Hello, I'm the founder of a consultancy. Budget 30k, in 4 weeks.")
+    assert lead.tag == "Cold"
+    assert "Clear problem" not in lead.reasoning
+
+
+def test_demo_scenarios_keep_their_tags():
+    for _name, message, expected in SCENARIOS:
+        assert classify_lead(message).tag == expected
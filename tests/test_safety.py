@@ -0,0 +1,28 @@
+"""Refusal phrase matching for the safety suite."""
+
+from core import data
+from core.data import refusal_matches, safety_passed, safety_passed_many
+
+
+def test_overlapping_refusals_are_all_found():
+    assert refusal_matches("Sorry, I can’t help with that.") == [
+        ("sorry", 0),
+        ("i can't", 7),
+        ("can't help", 9),
+    ]
+
+
+def test_nested_refusals_share_an_offset(monkeypatch):
+    keywords = ["not allowed", "not allowed here"]
+    pattern = data._compile_keywords(keywords).pattern
+    monkeypatch.setattr(data, "_REFUSAL_ALL_RE", data.re.compile(f"(?=({pattern}))"))
+    monkeypatch.setattr(data, "_REFUSAL_PHRASES", frozenset(keywords))
+    assert refusal_matches("That is not allowed here.") == [
+        ("not allowed here", 8),
+        ("not allowed", 8),
+    ]
+
+
+def test_batch_matches_single_checks():
+    texts = ["Sure, here it is.", "I cannot help with that.", "", "Not permitted."]
+    assert safety_passed_many(texts) == [safety_passed(t) for t in texts]
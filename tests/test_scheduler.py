@@ -0,0 +1,112 @@
+"""Pacing, backoff and the circuit breaker, against the fake OpenAI API."""
+
+import pytest
+from openai import OpenAI, RateLimitError
+
+from benchmarks.fake_openai import FakeConfig, start_server
+from core.scheduler import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RequestScheduler,
+    TokenBucket,
+    backoff_seconds,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def _start(**config):
+        config = FakeConfig(latency_ms=1, latency_sigma=0, retry_after=0.05, seed=1, **config)
+        server, base_url = start_server(config)
+        servers.append(server)
+        client = OpenAI(base_url=base_url, api_key="fake", max_retries=0)
+        call = lambda: client.chat.completions.create(  # noqa: E731
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}]
+        )
+        return config, call
+
+    yield _start
+    for server in servers:
+        server.shutdown()
+
+
+# ---------- token bucket ----------
+def test_bucket_sleeps_off_the_deficit():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)  # 1 unit / second
+    for _ in range(60):
+        assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire(2) == pytest.approx(2.0)
+    # Settling a smaller actual usage gives units back
+    clock.now += 10
+    bucket.adjust(5)
+    assert bucket.acquire(15) == 0.0
+
+
+# ---------- backoff ----------
+def test_backoff_is_capped_and_honours_retry_after(fake_server):
+    for attempt in range(10):
+        assert 0 <= backoff_seconds(attempt) <= 20.0
+    assert 3.0 <= backoff_seconds(0, retry_after=3.0) <= 3.25
+
+    _config, call = fake_server(error_rate=1.0, error_status=429)
+    with pytest.raises(RateLimitError) as exc:
+        call()
+    assert retry_after_seconds(exc.value) == pytest.approx(0.05)
+
+
+def test_retries_absorb_rate_limits(fake_server):
+    config, call = fake_server(error_rate=0.3, error_status=429)
+    scheduler = RequestScheduler(rpm=6000, tpm=10_000_000, sleep=lambda s: None)
+    for _ in range(20):
+        assert scheduler.run(call).choices[0].message.content
+    assert scheduler.stats()["retries"] == config.errors > 0
+    assert scheduler.stats()["failures"] == 0
+
+
+# ---------- circuit breaker ----------
+def test_rate_limits_never_open_the_breaker(fake_server):
+    config, call = fake_server(error_rate=1.0, error_status=429)
+    scheduler = RequestScheduler(rpm=6000, tpm=10_000_000, max_retries=2, sleep=lambda s: None)
+    for _ in range(5):
+        with pytest.raises(RateLimitError):
+            scheduler.run(call)
+    assert config.requests == 15
+    assert scheduler.breaker.state == "closed"
+
+
+def test_server_errors_open_then_half_open_the_breaker(fake_server):
+    clock = FakeClock()
+    config, call = fake_server(error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=30, clock=clock)
+    scheduler = RequestScheduler(
+        rpm=6000, tpm=10_000_000, max_retries=5, breaker=breaker, sleep=lambda s: None
+    )
+    with pytest.raises(CircuitOpenError):
+        scheduler.run(call)
+    assert config.requests == 3
+    assert breaker.state == "open"
+
+    # After the cooldown one trial call goes through and closes it again
+    clock.now += 30
+    assert breaker.state == "half-open"
+    config.error_rate = 0.0
+    assert scheduler.run(call).choices[0].message.content
+    assert breaker.state == "closed"
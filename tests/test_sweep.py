@@ -0,0 +1,28 @@
+"""Sweep arms share the response cache and still report what their calls cost."""
+
+from core.data import SAFETY_TESTS, SCENARIOS, get_response_cache
+from core.sweep import SweepArm, run_sweep
+
+
+def _sweep():
+    arms = [SweepArm("gpt-4o-mini", 0.0), SweepArm("gpt-4o-mini", 0.7)]
+    run_sweep(arms, SCENARIOS[:3], SAFETY_TESTS[:2], prefilter=False)
+    return [arm.summary() for arm in arms]
+
+
+def test_cache_keeps_usage_and_latency(fake_api):
+    cache = get_response_cache()
+    cache.put("k", "reply", {"prompt_tokens": 10, "completion_tokens": 2}, 120.5)
+    assert cache.get_entry("k") == ("reply", {"prompt_tokens": 10, "completion_tokens": 2}, 120.5)
+    assert cache.get("k") == "reply"
+
+
+def test_rerun_hits_the_cache_at_the_original_cost(fake_api):
+    first = _sweep()
+    assert all(s["cache_hits"] == 0 and s["cost_usd"] > 0 for s in first)
+
+    rerun = _sweep()
+    for before, after in zip(first, rerun):
+        assert after["cache_hits"] == 3 + 2
+        assert after["cost_usd"] == before["cost_usd"]
+        assert after["p50_ms"] >= before["p50_ms"] * 0.5